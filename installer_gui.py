@@ -10,37 +10,53 @@
 #
 # You should have received a copy of the GNU General Public License along with this program. If not,
 # see <https://www.gnu.org/licenses/>.
-import ctypes
+from __future__ import annotations
+
+import time
+
+# Taken before anything heavy is imported, --startup-time reports the time to first paint from here
+startup_clock = time.perf_counter()
+
+import codecs
+import contextlib
 import hashlib
 import json
+import mmap
 import os
+import queue
+import random
+import re
 import shutil
 import string
+import struct
 import subprocess
 import sys
 import threading
-import time
-import tkinter as tk
+import urllib.parse
 import urllib.request
 import webbrowser
-import winreg
-# pip install urllib3==1.25.11
-# The newer urllib has break changes.
-import xml.etree.ElementTree as Et
 import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from optparse import OptionParser
 from pathlib import Path
-from tkinter import filedialog, font
-from typing import Any, Dict, List, Tuple, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Set, Tuple, Optional, Union
+
+import win_platform
 
-import polib
-import pythoncom
-import requests
-import ttkbootstrap as ttk
-import winshell
-from tktooltip import ToolTip
-from ttkbootstrap.dialogs.dialogs import Messagebox
+# requests, polib and ElementTree are only imported by the code paths that use them, they cost the window
+# a noticeable delay in the frozen build otherwise.
+# The GUI modules are loaded by import_gui_modules, --batch and the mod parsing worker processes never need them
+# pip install urllib3==1.25.11
+# The newer urllib has break changes.
+if TYPE_CHECKING:
+    import requests
+    import tkinter as tk
+    from tkinter import filedialog, font
+
+    import ttkbootstrap as ttk
+    from tktooltip import ToolTip
+    from ttkbootstrap.dialogs.dialogs import Messagebox
 
 mods_link = 'https://tapio.lanzn.com/b0nxzso2b'
 project_repo_link = 'https://github.com/LocalizedKorabli/Korabli-LESTA-L10N/'
@@ -92,6 +108,13 @@ download_routes = {
     }
 }
 
+ee_routes = {
+    'gitee': 'https://gitee.com/localized-korabli/Korabli-LESTA-L10N/raw/main/BuiltInMods/LKExperienceEnhancement.zip',
+    'gitlab': 'https://gitlab.com/localizedkorabli/korabli-lesta-l10n/-/raw/main/BuiltInMods'
+              '/LKExperienceEnhancement.zip',
+    'github': 'https://github.com/LocalizedKorabli/Korabli-LESTA-L10N/raw/main/BuiltInMods/LKExperienceEnhancement.zip'
+}
+
 server_regions_dict: Dict[str, Tuple[str, bool]] = {
     'MK.RU.PRODUCTION': ('ru', True),
     'MK.RPT.PRODUCTION': ('ru', False),
@@ -100,6 +123,27 @@ server_regions_dict: Dict[str, Tuple[str, bool]] = {
     'WOWS.CN.PRODUCTION': ('zh_cn', True)
 }
 
+route_probe_timeout = 5
+# Seconds after which a download (or the version.info and catalog downloads of one install) stops retrying.
+# An attempt that is still transferring is never cut off
+download_deadline = 20
+# How long a mirror that has been faster before may take to answer after the first one
+route_preference_grace = 0.5
+
+processed_cache_dir = 'l10n_installer/processed'
+# Bump when the mod pipeline changes its output for the same inputs
+processed_cache_version = 1
+processed_cache_limit = 256 * 1024 * 1024
+# Zipped mods stay extracted in l10n_installer/cache between installs, this index tells which zip went where
+mod_index_file = 'l10n_installer/cache/index.json'
+# How long the game search waits for a drive before it gives up on it
+game_discovery_timeout = 3
+# The EE bundle is decompressed here once and linked into every build from there
+ee_staging_dir = 'l10n_installer/downloads/LK_EE'
+
+mo_magic = 0x950412de
+mo_magic_swapped = 0xde120495
+
 launcher_dict: Dict[str, str] = {
     'lgc_api.exe': '莱服客户端',
     'wgc_api.exe': '直营服客户端',
@@ -113,6 +157,15 @@ game_path_current = '<程序运行目录>'
 game_path_unknown = '<请选择游戏目录>'
 au_shortcut_path_desktop = '<用户桌面/默认名称>'
 
+# ms between two progress repaints
+progress_frame_interval = 33
+# Seconds the auto mode may hold back the game launch, can be overridden in global.json
+auto_launch_budget = 3.0
+# Game folders a batch job deploys to at the same time, unless the job file says otherwise
+batch_workers = 4
+# Where --batch writes its summary unless --summary says otherwise
+batch_summary_file = 'l10n_installer/batch_summary.json'
+
 msg_game_path_may_be_invalid = '''您选择的游戏目录缺失必要的游戏文件，
 可能并非战舰世界安装目录。'''
 msg_auto_update_notification = '''自动更新原理：
@@ -145,6 +198,9 @@ tooltip_src_gitlab = '从适合全球用户的GitLab线路（镜像）下载汉
 
 tooltip_src_github = '从适合港澳台/国外用户的GitHub线路（源仓库）下载汉化包'
 
+tooltip_src_auto = '''同时测试所有线路，
+自动选择最快的可用线路下载汉化包'''
+
 tooltip_src_local = '选择本地汉化包'
 
 tooltip_mo_path_selection = '手动选择要安装的汉化包文件'
@@ -190,7 +246,16 @@ class LocalizationInstallerAuto:
     isolation: bool
     download_src: str
     server_region: str
-    installing: bool = True
+    builds: Union[int, List[str]]
+    progress_bus: ProgressBus
+    # Set by the install thread once it is done, whatever the outcome
+    finished: threading.Event
+    # Set once the game has been started, from then on deploying is left to the next launch
+    launched: threading.Event
+    launch_lock: threading.Lock
+    hidden: bool = False
+    # --timings, print the per-phase install times to stdout
+    print_timings: bool = False
 
     install_progress_bar: ttk.Progressbar
     install_progress: tk.DoubleVar
@@ -210,7 +275,13 @@ class LocalizationInstallerAuto:
         self.isolation = bool(options.isolation)
         self.download_src = options.download_src
         self.server_region = options.server_region
+        self.builds = get_build_selection(options.chosen_builds or options.build_count)
+        self.print_timings = bool(options.print_timings)
         self.install_progress = tk.DoubleVar()
+        self.progress_bus = ProgressBus()
+        self.finished = threading.Event()
+        self.launched = threading.Event()
+        self.launch_lock = threading.Lock()
 
         ttk.Label(self.root, text='自动更新：') \
             .grid(row=0, column=0, columnspan=1, padx=10, pady=10, sticky=tk.W)
@@ -220,30 +291,64 @@ class LocalizationInstallerAuto:
 
         self.safely_set_install_progress(progress=0.0)
 
-        self.update_timer()
+        self.pump_progress()
         # print(f'{self.game_path}+{self.is_release}+{self.use_ee}+{self.use_mods}+{self.download_src}+{self.server_region}')
 
         tr = threading.Thread(target=self.do_install_update)
         tr.start()
+        if not self.no_run:
+            launch_budget = get_launch_budget(read_global_settings().get('auto_launch_budget'))
+            threading.Thread(target=self.launch_within_budget, args=(launch_budget,), daemon=True).start()
 
     def do_install_update(self):
-        _install_update(self,
-                        self.game_path, self.is_release,
-                        self.use_ee, self.use_mods,
-                        self.isolation, self.download_src,
-                        self.server_region)
-        self.installing = False
+        try:
+            _install_update(self,
+                            self.game_path, self.is_release,
+                            self.use_ee, self.use_mods,
+                            self.isolation, self.download_src,
+                            self.server_region, self.builds)
+        finally:
+            self.finished.set()
+
+    # A slow or dead mirror must not hold the game back: once the budget is spent the game starts with
+    # the catalog it already has, the update keeps downloading and is deployed on the next launch
+    def launch_within_budget(self, launch_budget: float):
+        if self.finished.wait(launch_budget) or not self.claim_launch():
+            return
+        print(f'汉化更新未在{launch_budget}秒内完成，先行启动游戏')
+        run_launcher(find_launcher(self.game_path)[0])
+
+    # Returns True for the one caller that gets to start the game
+    def claim_launch(self) -> bool:
+        with self.launch_lock:
+            if self.launched.is_set():
+                return False
+            self.launched.set()
+            return True
+
+    # Returns func's result, None if the game is running already and func has to wait for the next launch
+    def deploy_unless_launched(self, func: Callable, *args) -> Any:
+        with self.launch_lock:
+            if self.launched.is_set():
+                return None
+            return func(*args)
 
     def safely_set_install_progress(self, progress: Optional[float] = None):
-        self.root.after(0, self.install_progress.set(progress))
+        self.progress_bus.post('install_progress', progress)
 
-    def update_timer(self):
-        if not self.installing:
+    def pump_progress(self):
+        pump_progress(self, self.progress_bus)
+        if self.finished.is_set():
             self.root.destroy()
-        self.root.after(1000, self.update_timer)
+            return
+        if self.launched.is_set() and not self.hidden:
+            # Nothing left to wait for, the download finishes without a window
+            self.hidden = True
+            self.root.withdraw()
+        self.root.after(progress_frame_interval, self.pump_progress)
 
     def on_closed(self):
-        if not self.no_run:
+        if not self.no_run and self.claim_launch():
             run_launcher(find_launcher(self.game_path)[0])
 
 
@@ -274,10 +379,25 @@ class LocalizationInstaller:
     is_installing: bool = False
     game_launcher_file: Optional[Path] = None
     available_game_paths: List[str] = []
+    swept: bool = False
     user_desktop_path: Optional[Path] = None
-
-    def __init__(self, parent: tk.Tk):
+    # Detection and discovery run on background_executor, their results come back through ui_queue
+    background_executor: ThreadPoolExecutor
+    ui_queue: queue.Queue
+    # Bumped whenever the game path changes, detection results of an older generation are dropped
+    detection_generation: int = 0
+    detection_future: Optional[Future] = None
+    progress_bus: ProgressBus
+    # --timings, print the per-phase install times to stdout
+    print_timings: bool = False
+
+    def __init__(self, parent: tk.Tk, print_timings: bool = False):
         self.root = parent
+        self.print_timings = print_timings
+        self.background_executor = ThreadPoolExecutor(max_workers=2)
+        self.ui_queue = queue.Queue()
+        self.progress_bus = ProgressBus()
+        self.drain_ui_queue()
         self.root.title(f'澪刻·汉化安装器v{version}')
 
         self.game_path = tk.StringVar()
@@ -308,7 +428,8 @@ class LocalizationInstaller:
 
         self.refresh_path_combo()
 
-        self.auto_search = ttk.Button(parent, text='自动检测', command=lambda: self.find_game(overwrite=False),
+        self.auto_search = ttk.Button(parent, text='自动检测',
+                                      command=lambda: self.find_game_in_background(overwrite=False, sweep=True),
                                       style='success')
         self.auto_search.grid(row=1, column=2, columnspan=1)
         ToolTip(self.auto_search, msg=tooltip_auto_search_clients, delay=1.0)
@@ -355,6 +476,10 @@ class LocalizationInstaller:
         # 下载源
         ttk.Label(parent, text='汉化来源：').grid(row=7, column=0, padx=5, pady=5, sticky=tk.W)
         # 下载源选项
+        self.auto_src_button = ttk.Radiobutton(parent, text='自动选择', variable=self.download_source,
+                                               value='auto', style='success')
+        self.auto_src_button.grid(row=7, column=1, padx=5, pady=5, sticky=tk.W)
+        ToolTip(self.auto_src_button, tooltip_src_auto, delay=1.0)
         self.gitee_button = ttk.Radiobutton(parent, text='Gitee', variable=self.download_source,
                                             value='gitee', style='danger')
         self.gitee_button.grid(row=8, column=0, padx=5, pady=5, sticky=tk.W)
@@ -463,7 +588,7 @@ class LocalizationInstaller:
 
         mkdir('l10n_installer/downloads')
         mkdir('l10n_installer/mods')
-        mkdir('l10n_installer/processed')
+        mkdir(processed_cache_dir)
         mkdir('l10n_installer/settings')
 
         global_settings = self.parse_global_settings()
@@ -472,37 +597,77 @@ class LocalizationInstaller:
             for saved_path in last_saved_paths:
                 self.available_game_paths.append(saved_path)
             self.refresh_path_combo()
+        # The window shows the last known state right away, detection and discovery catch up in the background
         self.game_path.set(global_settings.get('last_game_path'))
         self.game_path_combo.current()
-        self.find_game()
-        self.on_game_path_changed()
+        self.find_game_in_background()
 
         self.gen_auto_update_path.set(au_shortcut_path_desktop)
 
         self.reset_progress()
-        self.game_launcher_status.set(find_launcher(self.get_game_path())[1])
+        self.pump_progress()
+
+    # func runs on the background executor, callback gets its result on the Tk thread.
+    # With a generation given, the result is dropped once the game path has changed in the meantime
+    def run_in_background(self, callback: Callable[[Any], None], func: Callable, *args,
+                          generation: Optional[int] = None) -> Future:
+        future = self.background_executor.submit(func, *args)
+        future.add_done_callback(lambda done: self.ui_queue.put((callback, done, generation)))
+        return future
+
+    def drain_ui_queue(self) -> None:
+        while True:
+            try:
+                callback, future, generation = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if future.cancelled() or (generation is not None and generation != self.detection_generation):
+                continue
+            try:
+                result = future.result()
+            except Exception as ex:
+                print(ex)
+                continue
+            callback(result)
+        self.root.after(50, self.drain_ui_queue)
+
+    def show_build_statuses(self, build_statuses: List[Tuple[str, Tuple[str, str]]]) -> None:
+        self.run_dirs = {run_dir: l10n_status[0] for run_dir, l10n_status in build_statuses}
+        if not build_statuses:
+            self.localization_status_1st.set('未发现游戏版本')
+            self.localization_status_2nd.set('')
+            return
+        self.localization_status_1st.set(build_statuses[0][1][1])
+        # The second line lists every other targeted build
+        self.localization_status_2nd.set('；'.join(l10n_status[1] for _, l10n_status in build_statuses[1:]))
 
     def reset_progress(self):
         self.safely_set_download_progress_text('等待中')
         self.safely_set_install_progress_text('等待中')
         self.safely_set_install_progress(progress=0.0)
 
+    # Safe to call from any thread, the Tk variables are only touched by pump_progress
     def safely_set_download_progress_text(self, msg: str):
-        self.root.after(0, self.download_progress_text.set(msg))
+        self.progress_bus.post('download_progress_text', msg)
 
     def safely_set_install_progress_text(self, msg: str):
-        self.root.after(0, self.install_progress_text.set('进度：' + msg))
+        self.progress_bus.post('install_progress_text', '进度：' + msg)
 
     def safely_set_install_progress(self, progress: Optional[float] = None):
-        self.root.after(0, self.install_progress.set(progress))
+        self.progress_bus.post('install_progress', progress)
+
+    def pump_progress(self):
+        pump_progress(self, self.progress_bus)
+        self.root.after(progress_frame_interval, self.pump_progress)
 
     def refresh_path_combo(self):
         self.game_path_combo['values'] = list(dict.fromkeys(self.available_game_paths))
 
-    def get_game_path(self, find: bool = True) -> Optional[Path]:
+    # None while no game is chosen, find_game_in_background fills the path in once a search finds one
+    def get_game_path(self) -> Optional[Path]:
         game_path_str = self.game_path.get()
         if game_path_str == game_path_unknown:
-            return self.find_game() if find else None
+            return None
         if game_path_str == game_path_current:
             return Path('.')
         return Path(game_path_str)
@@ -525,6 +690,10 @@ class LocalizationInstaller:
     def on_game_path_changed(self, *args) -> None:
         self.reset_progress()
         self.gen_auto_update.set(False)
+        # Whatever is still being detected for the previous path is stale now
+        self.detection_generation += 1
+        if self.detection_future:
+            self.detection_future.cancel()
         if self.game_path.get() == game_path_unknown:
             return
 
@@ -532,16 +701,45 @@ class LocalizationInstaller:
         if not game_path:
             return
 
-        self.detect_game_status()
-        parse_game_version(self, game_path)
-        self.game_launcher_file = find_launcher(game_path)[0]
+        self.localization_status_1st.set('正在检测游戏版本')
+        self.localization_status_2nd.set('')
+        self.detect_game_in_background(game_path)
+
+    # Safe to call from any thread, e.g. once an install is done. The result is applied on the Tk thread
+    def detect_game_in_background(self, game_path: Path) -> None:
+        self.detection_future = self.run_in_background(
+            self.apply_game_detection, self.detect_game, game_path,
+            get_build_selection(self.parse_global_settings().get('builds')), generation=self.detection_generation
+        )
 
+    # Runs off the Tk thread.
+    # Returns (install, [(run_dir, (l10n_version, l10n_status))], last installed l10n version, saved choice)
+    def detect_game(self, game_path: Path, builds: Union[int, List[str]]) \
+            -> Tuple['GameInstall', List[Tuple[str, Tuple[str, str]]], Optional[str], Dict[str, Any]]:
+        install = get_game_install(game_path)
+        run_dirs = select_builds(game_path, builds)
+        build_statuses = [(run_dir, get_local_l10n_version(game_path, run_dir)) for run_dir in run_dirs]
+        installed_versions = [installed_version for installed_version in
+                              (read_installed_l10n_version(game_path, run_dir) for run_dir in run_dirs)
+                              if installed_version is not None]
         mkdir(game_path.joinpath('l10n_installer/settings'))
         mkdir(game_path.joinpath('l10n_installer/mods'))
+        return install, build_statuses, installed_versions[-1] if installed_versions else None, \
+            read_choice(game_path)
+
+    def apply_game_detection(self, detection: Tuple['GameInstall', List[Tuple[str, Tuple[str, str]]],
+                                                    Optional[str], Dict[str, Any]]) -> None:
+        install, build_statuses, last_installed_l10n_version, choice = detection
+        if last_installed_l10n_version is not None:
+            self.last_installed_l10n_version = last_installed_l10n_version
+        self.detect_game_status()
+        self.show_build_statuses(build_statuses)
+        self.game_launcher_file = install.launcher
+        self.game_launcher_status.set(find_launcher(install.path)[1])
 
-        choice = self.parse_choice(use_cache=False)
-        if not choice:
-            return
+        self.choice = choice
+        self.check_choice()
+        choice = self.choice
 
         self.server_region.set(choice.get('server_region', 'ru'))
         self.is_release.set(choice.get('is_release', True))
@@ -580,9 +778,37 @@ class LocalizationInstaller:
         # return self.server_region.get() == 'ru' and self.is_release.get()
         return self.server_region.get() == 'ru'
 
-    def find_game(self, overwrite: bool = True) -> Optional[Path]:
-        found_in_reg = self.find_from_reg()
-        found_manually = self.find_manually()
+    def find_game_in_background(self, overwrite: bool = True, sweep: bool = False) -> None:
+        self.run_in_background(lambda found_games: self.apply_found_games(found_games, overwrite),
+                               search_games, *self.get_search_args(sweep))
+
+    # Returns the arguments of search_games
+    def get_search_args(self, sweep: bool) -> Tuple[List[str], List[str], bool, bool]:
+        global_settings = self.parse_global_settings()
+        # Sweeping every drive only happens on request, or once while no install is known at all
+        sweep_if_nothing_found = not self.swept
+        self.swept = True
+        return list(global_settings['game_index'].keys()), list(global_settings.get('game_search_roots') or []), \
+            sweep, sweep_if_nothing_found
+
+    def apply_found_games(self, found_games: Tuple[List[Path], Dict[str, bool], List[Path]],
+                          overwrite: bool) -> Optional[Path]:
+        found_in_reg, validated, found_manually = found_games
+        game_index: Dict[str, float] = self.parse_global_settings()['game_index']
+        found_known = []
+        # Paths that didn't answer in time (e.g. a sleeping drive) are kept for the next launch
+        for path_str, valid in validated.items():
+            if valid:
+                game_index[path_str] = time.time()
+                found_known.append(Path(path_str))
+            else:
+                game_index.pop(path_str, None)
+        for found_path in found_manually:
+            game_index[str(found_path.absolute())] = time.time()
+        for found_path in found_in_reg + found_known + found_manually:
+            self.available_game_paths.append(str(found_path.absolute()))
+        self.refresh_path_combo()
+        found_manually = found_manually or found_known
         game_path_str = self.game_path.get()
         if not overwrite:
             return None
@@ -606,59 +832,6 @@ class LocalizationInstaller:
             return manually_first
         return None
 
-    def find_from_reg(self) -> List[Path]:
-        try:
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\Classes\lgc\DefaultIcon') as key:
-                lgc_dir_str, _ = winreg.QueryValueEx(key, '')
-                if lgc_dir_str is None:
-                    # Try the default value
-                    lgc_dir_str = r'C:\ProgramData\Lesta\GameCenter\lgc.exe'
-                if ',' in lgc_dir_str:
-                    lgc_dir_str = lgc_dir_str.split(',')[0]
-                preferences_path = Path(lgc_dir_str).parent.joinpath('preferences.xml')
-                if not preferences_path.is_file():
-                    return []
-                pref_root = Et.parse(preferences_path).getroot()
-                games_block = pref_root.find('.//application/games_manager/games')
-                games = games_block.findall('.//game')
-                if not games:
-                    return []
-                path_strs = [game.find('working_dir').text for game in games if game.find('working_dir') is not None]
-                path_strs_filtered = [dir_str for dir_str in path_strs if is_valid_game_path(Path(dir_str))]
-                for path_str in path_strs_filtered:
-                    self.available_game_paths.append(path_str)
-                self.refresh_path_combo()
-                return [Path(dir_str) for dir_str in path_strs_filtered]
-        except Exception:
-            pass
-
-    def find_manually(self) -> List[Path]:
-        found_manually: List[Path] = []
-        drives = find_all_drives()
-        for drive in drives:
-            for possible_path in [
-                Path(drive).joinpath('Games').joinpath('Korabli'),
-                Path(drive).joinpath('Games').joinpath('Korabli_PT'),
-                Path(drive).joinpath('Korabli'),
-                Path(drive).joinpath('Korabli_PT'),
-                Path(drive).joinpath('Program Files (x86)').joinpath('Steam')
-                        .joinpath('steamapps').joinpath('common').joinpath('Korabli'),
-                Path(drive).joinpath('Program Files (x86)').joinpath('Steam')
-                        .joinpath('steamapps').joinpath('common').joinpath('Korabli_PT'),
-                Path(drive).joinpath('Program Files').joinpath('Steam')
-                        .joinpath('steamapps').joinpath('common').joinpath('Korabli'),
-                Path(drive).joinpath('Program Files').joinpath('Steam')
-                        .joinpath('steamapps').joinpath('common').joinpath('Korabli_PT'),
-                Path(drive).joinpath('SteamLibrary').joinpath('steamapps').joinpath('common').joinpath('Korabli'),
-                Path(drive).joinpath('SteamLibrary').joinpath('steamapps').joinpath('common').joinpath('Korabli_PT')
-            ]:
-                if is_valid_game_path(possible_path):
-                    found_manually.append(possible_path)
-        for found_path in found_manually:
-            self.available_game_paths.append(str(found_path.absolute()))
-        self.refresh_path_combo()
-        return found_manually
-
     def popup_result(self, nothing_wrong: bool):
         if nothing_wrong:
             msg_response = Messagebox.show_question('汉化安装完成。是否启动游戏？', '安装完成', alert=True, buttons=[
@@ -743,30 +916,22 @@ class LocalizationInstaller:
         mods = '--mods' if self.mods_selection.get() else ''
         isolation = '--isolation' if self.isolation.get() else ''
         region = self.server_region.get()
+        build_selection = get_build_selection(self.parse_global_settings().get('builds'))
+        if isinstance(build_selection, list):
+            builds = ' '.join(f'--build {build}' for build in build_selection)
+        else:
+            builds = f'--builds {build_selection}'
 
-        pythoncom.CoInitialize()
-        with winshell.shortcut(str(self.get_au_shortcut_path().absolute())) as link:
-            link.path = str(sys.executable)
-            link.description = '自动更新汉化并启动战舰世界'
-            icon_location = self.get_shortcut_icon_location(Path(game_path))
-            if icon_location is not None:
-                link.icon_location = icon_location
-            link.arguments = f'--auto --gamepath "{game_path}" {release} {ee} {mods} {isolation} ' \
-                             f'--region {region} --src "{src}"'
-        pythoncom.CoUninitialize()
+        win_platform.create_shortcut(str(self.get_au_shortcut_path().absolute()), str(sys.executable),
+                                     f'--auto --gamepath "{game_path}" {release} {ee} {mods} {isolation} '
+                                     f'--region {region} --src "{src}" {builds}',
+                                     '自动更新汉化并启动战舰世界', self.get_shortcut_icon_location(Path(game_path)))
 
     def get_shortcut_icon_location(self, game_path: Path) -> Optional[Tuple[str, int]]:
         if not game_path.is_dir():
             return None
-        game_file = game_path.joinpath('Korabli.exe')
-        if game_file.is_file():
-            return str(game_file.absolute()), 0
-        else:
-            game_file = game_path.joinpath('WorldOfWarships.exe')
-            if game_file.is_file():
-                return str(game_file.absolute()), 0
-            else:
-                return None
+        game_file = get_game_install(game_path).executable
+        return (str(game_file.absolute()), 0) if game_file else None
 
     def get_choice_template(self):
         self.detect_game_status()
@@ -784,7 +949,15 @@ class LocalizationInstaller:
             'last_game_path': game_path_unknown,
             'available_game_paths': [
                 game_path_current
-            ]
+            ],
+            # 0: decide automatically, 1: parse mods serially, n: parse mods in n worker processes
+            'mod_parse_workers': 0,
+            # Where the full search looks for installs, every drive if empty
+            'game_search_roots': [],
+            # Installs found by the full search: {path: last validated}
+            'game_index': {},
+            # How many of the newest builds get installed, or a list of the build dirs to install
+            'builds': 2
         }
 
     def detect_game_status(self, manually: bool = False):
@@ -794,33 +967,12 @@ class LocalizationInstaller:
         game_path = self.get_game_path()
         if not game_path:
             return
-        game_info_file = game_path.joinpath('game_info.xml')
-        if not game_info_file.is_file():
-            self.detect_steam_game_status(game_path)
+        game_type = get_game_install(game_path).game_type
+        if game_type is None:
             return
-        game_info = Et.parse(game_info_file)
-        game_id = game_info.find('.//game/id')
-        if game_id is None:
-            return
-        game_type: (str, bool) = server_regions_dict.get(
-            game_id.text,
-            # By default RU
-            ('ru', 'PT.PRODUCTION' not in game_id.text)
-        )
         self.server_region.set(game_type[0])
         self.is_release.set(game_type[1])
 
-    def detect_steam_game_status(self, game_path: Path):
-        if not game_path.joinpath('steam_api64.dll').is_file():
-            return
-        if game_path.joinpath('Korabli.exe').is_file():
-            self.server_region.set('ru')
-            self.is_release.set(True)
-            return
-        if game_path.joinpath('WorldOfWarships.exe').is_file():
-            self.server_region.set('wg')
-            self.is_release.set(True)
-
     def launch_game(self) -> None:
         if not self.game_launcher_file or not self.game_launcher_file.is_file():
             self.game_launcher_file = find_launcher(self.get_game_path())[0]
@@ -832,20 +984,14 @@ class LocalizationInstaller:
     def parse_global_settings(self):
         if self.global_settings:
             return self.global_settings
-        self.global_settings = {}
-        global_settings_file = Path('l10n_installer/settings/global.json')
-        if global_settings_file.is_file():
-            try:
-                with open(global_settings_file, 'r', encoding='utf-8') as f:
-                    self.global_settings = json.load(f)
-            except Exception:
-                pass
+        self.global_settings = read_global_settings()
         self.check_global_settings()
         return self.global_settings
 
     def check_global_settings(self):
         template = self.get_global_settings_template()
-        for entry in ['last_game_path', 'available_game_paths']:
+        for entry in ['last_game_path', 'available_game_paths', 'mod_parse_workers', 'game_search_roots',
+                      'game_index', 'builds']:
             if entry not in self.global_settings.keys():
                 self.global_settings[entry] = template[entry]
 
@@ -857,23 +1003,6 @@ class LocalizationInstaller:
             with open('l10n_installer/settings/global.json', 'w', encoding='utf-8') as f:
                 json.dump(self.global_settings, f, ensure_ascii=False, indent=4)
 
-    def parse_choice(self, use_cache: bool = True) -> Optional[Dict[str, str]]:
-        if use_cache and self.choice:
-            return self.choice
-        self.choice = {}
-        game_path = self.get_game_path(find=False)
-        if not game_path:
-            return None
-        choice_file = game_path.joinpath('l10n_installer/settings/choice.json')
-        if os.path.isfile(choice_file):
-            try:
-                with open(choice_file, 'r', encoding='utf-8') as f:
-                    self.choice = json.load(f)
-            except Exception:
-                pass
-        self.check_choice()
-        return self.choice
-
     def check_choice(self):
         template = self.get_choice_template()
         for choice in ['server_region', 'is_release', 'download_source', 'use_ee', 'apply_mods', 'isolation']:
@@ -882,7 +1011,7 @@ class LocalizationInstaller:
 
     def save_choice(self) -> None:
         if self.choice and self.game_path.get() != game_path_unknown:
-            game_path = self.get_game_path(find=False)
+            game_path = self.get_game_path()
             if not game_path:
                 return
             self.choice['is_release'] = self.is_release.get()
@@ -894,61 +1023,362 @@ class LocalizationInstaller:
                 json.dump(self.choice, f, ensure_ascii=False, indent=4)
 
     def on_closed(self):
+        self.background_executor.shutdown(wait=False, cancel_futures=True)
         self.save_global_settings()
 
 
+class ProgressBus:
+    # Progress reported by the install workers. Posting only overwrites the latest value of a channel,
+    # so it costs the same no matter how often a worker reports, and the Tk side never sees more
+    # than one update per channel and frame.
+    pending: Dict[str, Any]
+
+    def __init__(self):
+        self.pending = {}
+
+    def post(self, channel: str, value: Any) -> None:
+        self.pending[channel] = value
+
+    def drain(self) -> Dict[str, Any]:
+        drained = {}
+        while True:
+            try:
+                # A value posted meanwhile is newer, it gets popped later in this loop or on the next frame
+                channel, value = self.pending.popitem()
+            except KeyError:
+                return drained
+            drained[channel] = value
+
+
+# Channels are named after the Tk variables they end up in
+def pump_progress(gui: Union[LocalizationInstaller, LocalizationInstallerAuto], progress_bus: ProgressBus) -> None:
+    for channel, value in progress_bus.drain().items():
+        getattr(gui, channel).set(value)
+
+
+def read_choice(game_path: Path) -> Dict[str, Any]:
+    choice_file = game_path.joinpath('l10n_installer/settings/choice.json')
+    try:
+        with open(choice_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
 def mkdir(t_dir: Any):
     os.makedirs(t_dir, exist_ok=True)
 
 
-def process_modification_file(source_mo, mod_path: str,
-                              json_mods_d: Dict[str, Union[str, List[str]]], json_mods_m: Dict[str, str]) -> bool:
-    translated = None
-    is_json_mod = False
+def read_global_settings() -> Dict[str, Any]:
+    global_settings_file = Path('l10n_installer/settings/global.json')
+    if global_settings_file.is_file():
+        try:
+            with open(global_settings_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {}
+
+
+class MOCatalog:
+    # A gettext MO catalog read in place from a memory-mapped file (or any bytes-like buffer).
+    # Only the header and the two offset tables are parsed up front, strings are sliced out on demand
+    # and only decoded when somebody asks for text.
+    buffer: Any
+    view: memoryview
+    file: Optional[Any]
+    count: int
+    key_table: Tuple[int, ...]
+    value_table: Tuple[int, ...]
+    encoding: str
+    # Digest of the whole catalog, computed at most once per install (see get_sha256)
+    sha256: Optional[str] = None
+
+    def __init__(self, buffer: Any, file: Optional[Any] = None):
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.file = file
+        size = len(self.view)
+        if size < 28:
+            raise ValueError('Invalid mo file, file is too small')
+        magic = struct.unpack_from('<I', self.view, 0)[0]
+        if magic == mo_magic:
+            byte_order = '<'
+        elif magic == mo_magic_swapped:
+            byte_order = '>'
+        else:
+            raise ValueError('Invalid mo file, magic number is incorrect')
+        revision, self.count, key_offset, value_offset = struct.unpack_from(f'{byte_order}4I', self.view, 4)
+        if revision >> 16 not in (0, 1):
+            raise ValueError('Invalid mo file, unexpected major revision number')
+        if key_offset + 8 * self.count > size or value_offset + 8 * self.count > size:
+            raise ValueError('Invalid mo file, offset tables out of range')
+        self.key_table = struct.unpack_from(f'{byte_order}{2 * self.count}I', self.view, key_offset)
+        self.value_table = struct.unpack_from(f'{byte_order}{2 * self.count}I', self.view, value_offset)
+        if self.count and (max(self.key_table[1::2]) > size or max(self.value_table[1::2]) > size):
+            raise ValueError('Invalid mo file, string offsets out of range')
+        self.encoding = 'utf-8'
+        if self.count and not self.key(0):
+            charset = re.search(rb'charset=([\w-]+)', self.value(0))
+            if charset:
+                try:
+                    self.encoding = codecs.lookup(charset.group(1).decode('ascii')).name
+                except LookupError:
+                    pass
+
+    @classmethod
+    def open(cls, mo_path: Union[str, Path]) -> 'MOCatalog':
+        file = open(mo_path, 'rb')
+        try:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), file)
+        except Exception:
+            file.close()
+            raise
+
+    def get_sha256(self) -> str:
+        if self.sha256 is None:
+            self.sha256 = hashlib.sha256(self.view).hexdigest()
+        return self.sha256
+
+    def close(self) -> None:
+        self.view.release()
+        if self.file:
+            self.buffer.close()
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> 'MOCatalog':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def key(self, index: int) -> bytes:
+        length, offset = self.key_table[2 * index], self.key_table[2 * index + 1]
+        return self.view[offset:offset + length].tobytes()
+
+    # Returns (offset: int, length: int)
+    def value_span(self, index: int) -> Tuple[int, int]:
+        return self.value_table[2 * index + 1], self.value_table[2 * index]
+
+    def value(self, index: int) -> bytes:
+        offset, length = self.value_span(index)
+        return self.view[offset:offset + length].tobytes()
+
+    # Yields (msgctxt: Optional[str], msgid: str, msgid_plural: Optional[str], msgstr: Union[str, Dict[int, str]])
+    def entries(self) -> Iterator[Tuple[Optional[str], str, Optional[str], Union[str, Dict[int, str]]]]:
+        for index in range(self.count):
+            key = self.key(index).decode(self.encoding)
+            if not key:
+                continue
+            msgctxt = None
+            if '\x04' in key:
+                msgctxt, key = key.split('\x04', 1)
+            value = self.value(index).decode(self.encoding)
+            if '\0' in key:
+                msgid, msgid_plural = key.split('\0', 1)
+                yield msgctxt, msgid, msgid_plural, dict(enumerate(value.split('\0')))
+            else:
+                yield msgctxt, key, None, value
+
+
+class ModOverlay:
+    # All mods folded into msgid-keyed tables in load order, later mods overwriting earlier ones,
+    # so that the base catalog only has to be walked once no matter how many mods are installed.
+    # singular: msgid -> (msgctxt, msgstr)
+    singular: Dict[str, Tuple[Optional[str], str]]
+    # plural: msgid -> (msgctxt, msgid_plural, msgstr_plural)
+    plural: Dict[str, Tuple[Optional[str], str, Dict[int, str]]]
+    # JSON mods: "replace" tables still take precedence over .mo/.po mods, "words" apply to everything else
+    json_mods_d: Dict[str, Union[str, List[str]]]
+    json_mods_m: Dict[str, str]
+
+    def __init__(self):
+        self.singular = {}
+        self.plural = {}
+        self.json_mods_d = {}
+        self.json_mods_m = {}
+
+    def copy(self) -> 'ModOverlay':
+        overlay = ModOverlay()
+        overlay.singular = dict(self.singular)
+        overlay.plural = dict(self.plural)
+        overlay.json_mods_d = dict(self.json_mods_d)
+        overlay.json_mods_m = dict(self.json_mods_m)
+        return overlay
+
+    def add_parsed_mod(self, parsed_mod: Optional['ParsedMod']) -> bool:
+        if not parsed_mod:
+            return False
+        singular, plural, json_mods_d, json_mods_m = parsed_mod
+        self.singular.update(singular)
+        self.plural.update(plural)
+        self.json_mods_d.update(json_mods_d)
+        self.json_mods_m.update(json_mods_m)
+        return True
+
+    # Returns the sha256 of the written catalog
+    def write_catalog(self, source_mo: MOCatalog, output_file: str) -> str:
+        # Each translation applies to the first catalog entry with its msgid, the rest get appended.
+        # Values nobody touched are written straight from the source buffer without being decoded.
+        encoding = source_mo.encoding
+        singular = {msgid.encode(encoding): translation for msgid, translation in self.singular.items()}
+        plural = {msgid.encode(encoding): translation for msgid, translation in self.plural.items()}
+        json_mods_d = {msgid.encode(encoding): target for msgid, target in self.json_mods_d.items()}
+        words_replacer = WordsReplacer(self.json_mods_m)
+        # (key, value), an untouched value is kept as its (offset, length) in the source
+        records: List[Tuple[bytes, Union[bytes, Tuple[int, int]]]] = []
+        for index in range(len(source_mo)):
+            key = source_mo.key(index)
+            value_span = source_mo.value_span(index)
+            # Strip the context, msgids are matched without it
+            msgid, is_plural, _ = key[key.find(b'\x04') + 1:].partition(b'\0')
+            if not msgid:
+                records.append((key, value_span))
+                continue
+            value = None
+            if is_plural:
+                translation = plural.pop(msgid, None)
+                if translation:
+                    value = encode_msgstr_plural(translation[2], encoding)
+            else:
+                translation = singular.pop(msgid, None)
+                if translation and msgid != b'IDS_RIGHTS_RESERVED':
+                    value = translation[1].encode(encoding)
+            if value is None:
+                offset, length = value_span
+                untouched = source_mo.view[offset:offset + length]
+                value = apply_json_mods(msgid, bool(is_plural), untouched, json_mods_d, words_replacer, encoding)
+                records.append((key, value_span if value is untouched else value))
+            else:
+                records.append((key, apply_json_mods(msgid, bool(is_plural), value, json_mods_d, words_replacer,
+                                                     encoding)))
+        for msgid, (msgctxt, msgstr) in singular.items():
+            key = (msgctxt.encode(encoding) + b'\x04' if msgctxt else b'') + msgid
+            records.append((key, apply_json_mods(msgid, False, msgstr.encode(encoding), json_mods_d, words_replacer,
+                                                 encoding)))
+        for msgid, (msgctxt, msgid_plural, msgstr_plural) in plural.items():
+            key = (msgctxt.encode(encoding) + b'\x04' if msgctxt else b'') + msgid + b'\0' + \
+                  msgid_plural.encode(encoding)
+            records.append((key, apply_json_mods(msgid, True, encode_msgstr_plural(msgstr_plural, encoding),
+                                                 json_mods_d, words_replacer, encoding)))
+        return write_mo_records(source_mo, records, output_file)
+
+
+# A mod file parsed into ModOverlay's tables: (singular, plural, json_mods_d, json_mods_m)
+ParsedMod = Tuple[Dict[str, Tuple[Optional[str], str]], Dict[str, Tuple[Optional[str], str, Dict[int, str]]],
+                  Dict[str, Union[str, List[str]]], Dict[str, str]]
+
+
+def parse_mod_file(mod_path: str) -> Optional[ParsedMod]:
+    singular: Dict[str, Tuple[Optional[str], str]] = {}
+    plural: Dict[str, Tuple[Optional[str], str, Dict[int, str]]] = {}
+    json_mods_d: Dict[str, Union[str, List[str]]] = {}
+    json_mods_m: Dict[str, str] = {}
     if mod_path.endswith('po'):
-        translated = polib.pofile(mod_path)
+        import polib
+        translated = [(entry.msgctxt, entry.msgid, entry.msgid_plural,
+                       entry.msgstr_plural if entry.msgid_plural else entry.msgstr)
+                      for entry in polib.pofile(mod_path)]
     elif mod_path.endswith('mo'):
-        translated = polib.mofile(mod_path)
+        with MOCatalog.open(mod_path) as mod_mo:
+            translated = list(mod_mo.entries())
     elif mod_path.endswith('l10nmod') or mod_path.endswith('json'):
-        is_json_mod = True
-
-    if translated:
-        translation_dict_singular: Dict[str, polib.MOEntry] = {entry.msgid: entry for entry in translated if
-                                                               entry.msgid and not entry.msgid_plural}
-        translation_dict_plural: Dict[str, polib.MOEntry] = {entry.msgid: entry for entry in translated if
-                                                             entry.msgid and entry.msgid_plural}
-        singular_count = len(translation_dict_singular)
-        plural_count = len(translation_dict_plural)
-        for entry in source_mo:
-            if not entry.msgid:
-                continue
-            if singular_count == 0 and plural_count == 0:
-                break
-            if entry.msgid_plural and entry.msgid_plural in translation_dict_plural:
-                target_strs = translation_dict_plural[entry.msgid].msgstr_plural
-                del translation_dict_plural[entry.msgid]
-                plural_count -= 1
-                entry.msgstr_plural = target_strs
-            elif entry.msgid and entry.msgid in translation_dict_singular:
-                target_str = translation_dict_singular[entry.msgid].msgstr
-                del translation_dict_singular[entry.msgid]
-                singular_count -= 1
-                if entry.msgid == 'IDS_RIGHTS_RESERVED':
-                    continue
-                entry.msgstr = target_str
-        if singular_count > 0 or plural_count > 0:
-            for s_e in translation_dict_singular:
-                source_mo.append(translation_dict_singular[s_e])
-            for p_e in translation_dict_plural:
-                source_mo.append(translation_dict_plural[p_e])
-    elif is_json_mod:
         try:
             with open(mod_path, 'r', encoding='utf-8') as f:
                 json_mod = json.load(f)
             append_json_mod(json_mod, json_mods_d, json_mods_m)
         except Exception:
             pass
-    return translated or is_json_mod
+        return singular, plural, json_mods_d, json_mods_m
+    else:
+        return None
+    if not translated:
+        return None
+    for msgctxt, msgid, msgid_plural, msgstr in translated:
+        if not msgid:
+            continue
+        if msgid_plural:
+            plural[msgid] = (msgctxt, msgid_plural, msgstr)
+        else:
+            singular[msgid] = (msgctxt, msgstr)
+    return singular, plural, json_mods_d, json_mods_m
+
+
+# Also runs in worker processes, where an exception would abort the whole map
+def try_parse_mod_file(mod_path: str) -> Optional[ParsedMod]:
+    try:
+        return parse_mod_file(mod_path)
+    except Exception:
+        return None
+
+
+# Yields the parsed mods in the given order no matter how many workers are used,
+# so merging them stays identical to applying them one by one
+def parse_mod_files(mod_paths: List[str], workers: int) -> Iterator[Optional[ParsedMod]]:
+    if workers <= 1 or len(mod_paths) < 2:
+        for mod_path in mod_paths:
+            yield try_parse_mod_file(mod_path)
+        return
+    # Pulls in multiprocessing, only worth it once there are workers to start
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(try_parse_mod_file, mod_paths)
+
+
+def get_launch_budget(configured: Any) -> float:
+    if isinstance(configured, (int, float)) and not isinstance(configured, bool) and 0 <= configured <= 600:
+        return configured
+    return auto_launch_budget
+
+
+def get_mod_parse_workers(configured: Any, mod_paths: List[str]) -> int:
+    if isinstance(configured, int) and not isinstance(configured, bool) and configured > 0:
+        return configured
+    # Auto: .po parsing is the only CPU-heavy part, worker processes don't pay off for one or two small files.
+    # The frozen build parses serially unless configured otherwise.
+    po_count = len([mod_path for mod_path in mod_paths if mod_path.endswith('po')])
+    if getattr(sys, 'frozen', False) or po_count < 2:
+        return 1
+    return min(po_count, os.cpu_count() or 1)
+
+
+def encode_msgstr_plural(msgstr_plural: Union[Dict[int, str], List[str]], encoding: str) -> bytes:
+    if isinstance(msgstr_plural, Dict):
+        msgstr_plural = [msgstr_plural[i] for i in sorted(msgstr_plural.keys())]
+    return b'\0'.join(str(msgstr).encode(encoding) for msgstr in msgstr_plural)
+
+
+# Returns the sha256 of the written catalog, hashed on the way out instead of reading the file back
+def write_mo_records(source_mo: MOCatalog, records: List[Tuple[bytes, Union[bytes, Tuple[int, int]]]],
+                     output_file: str) -> str:
+    records.sort(key=lambda record: record[0])
+    count = len(records)
+    key_start = 28 + 16 * count
+    key_offsets: List[int] = []
+    position = key_start
+    for key, _ in records:
+        key_offsets += [len(key), position]
+        position += len(key) + 1
+    value_offsets: List[int] = []
+    for _, value in records:
+        length = value[1] if isinstance(value, tuple) else len(value)
+        value_offsets += [length, position]
+        position += length + 1
+    keys = b''.join(key + b'\0' for key, _ in records)
+    values = b'\0'.join(source_mo.view[value[0]:value[0] + value[1]] if isinstance(value, tuple) else value
+                        for _, value in records) + b'\0'
+    digest = hashlib.sha256()
+    with open(output_file, 'wb') as f:
+        for block in (struct.pack('<7I', mo_magic, 0, count, 28, 28 + 8 * count, 0, key_start),
+                      struct.pack(f'<{2 * count}I', *key_offsets), struct.pack(f'<{2 * count}I', *value_offsets),
+                      keys, values):
+            f.write(block)
+            digest.update(block)
+    return digest.hexdigest()
 
 
 def append_json_mod(json_mod: Dict[str, Any],
@@ -969,56 +1399,200 @@ def append_json_mod(json_mod: Dict[str, Any],
                     json_mods_m[w_k] = w_v
 
 
-def process_json_mods(source_mo, json_mods_d_replace: Dict[str, Union[str, List[str]]],
-                      json_mods_m_replace: Dict[str, str]):
-    for entry in source_mo:
-        if not entry.msgid:
-            continue
-        if entry.msgid_plural:
-            for m_k in json_mods_m_replace:
-                m_v = json_mods_m_replace[m_k]
-                msgstrs: Dict[int, str] = entry.msgstr_plural
-                should_modify = False
-                for i in msgstrs.keys():
-                    if m_k in msgstrs.get(i):
-                        msgstrs[i] = msgstrs.get(i).replace(m_k, m_v)
-                        should_modify = True
-                if should_modify:
-                    entry.msgstr_plural = msgstrs
-            for d_k in json_mods_d_replace:
-                if entry.msgid == d_k:
-                    target_text = json_mods_d_replace[d_k]
-                    if isinstance(target_text, str):
-                        list_l = len(entry.msgstr_plural)
-                        entry.msgstr_plural = {i: target_text for i in range(list_l)}
-                    elif isinstance(target_text, List):
-                        entry.msgstr_plural = {i: target_text[i] for i in range(len(target_text))}
+class WordsReplacer:
+    # Rewrites every "words" mod in a single left-to-right pass over a string.
+    # Overlapping patterns: the leftmost match wins, the longest pattern wins among matches starting at the same
+    # position, and replaced text is never scanned again. When no pattern overlaps another (or any replacement),
+    # this gives exactly the same result as calling str.replace for each pattern in load order.
+    words: Dict[str, str]
+    pattern: Optional[re.Pattern]
+    utf8_words: Dict[bytes, bytes]
+    utf8_pattern: Optional[re.Pattern]
+
+    def __init__(self, words: Dict[str, str]):
+        # An empty pattern would match between every two characters
+        self.words = {w_k: w_v for w_k, w_v in words.items() if w_k}
+        self.pattern = None
+        self.utf8_words = {}
+        self.utf8_pattern = None
+        if self.words:
+            # re tries alternatives in order, so longer patterns go first
+            alternatives = sorted(self.words.keys(), key=len, reverse=True)
+            self.pattern = re.compile('|'.join(re.escape(alternative) for alternative in alternatives))
+
+    def __bool__(self) -> bool:
+        return self.pattern is not None
+
+    def replace(self, text: str) -> str:
+        if self.pattern is None or not text:
+            return text
+        return self.pattern.sub(self._substitute, text)
+
+    def _substitute(self, match: re.Match) -> str:
+        return self.words[match.group(0)]
+
+    # Same as replace, but on an encoded msgstr. Returns the input object itself when nothing matched.
+    def replace_encoded(self, data: Any, encoding: str) -> Any:
+        if self.pattern is None:
+            return data
+        if encoding != 'utf-8':
+            text = bytes(data).decode(encoding)
+            replaced = self.replace(text)
+            return data if replaced == text else replaced.encode(encoding)
+        # UTF-8 is self-synchronizing, so the patterns can be matched on the raw bytes without decoding
+        if self.utf8_pattern is None:
+            self.utf8_words = {w_k.encode('utf-8'): w_v.encode('utf-8') for w_k, w_v in self.words.items()}
+            alternatives = sorted(self.utf8_words.keys(), key=len, reverse=True)
+            self.utf8_pattern = re.compile(b'|'.join(re.escape(alternative) for alternative in alternatives))
+        if self.utf8_pattern.search(data) is None:
+            return data
+        return self.utf8_pattern.sub(self._substitute_utf8, data)
+
+    def _substitute_utf8(self, match: re.Match) -> bytes:
+        return self.utf8_words[match.group(0)]
+
+
+def apply_json_mods(msgid: bytes, is_plural: bool, value: Any,
+                    json_mods_d_replace: Dict[bytes, Union[str, List[str]]], words_replacer: WordsReplacer,
+                    encoding: str) -> Any:
+    if words_replacer:
+        value = words_replacer.replace_encoded(value, encoding)
+    target_text = json_mods_d_replace.get(msgid)
+    if isinstance(target_text, str):
+        if is_plural:
+            list_l = bytes(value).count(b'\0') + 1
+            value = b'\0'.join([target_text.encode(encoding)] * list_l)
         else:
-            for m_k in json_mods_m_replace:
-                m_v = json_mods_m_replace[m_k]
-                msgstr = entry.msgstr
-                if m_k in msgstr:
-                    entry.msgstr = msgstr.replace(m_k, m_v)
-            for d_k in json_mods_d_replace:
-                if entry.msgid == d_k:
-                    target_text = json_mods_d_replace[d_k]
-                    if isinstance(target_text, str):
-                        entry.msgstr = target_text
+            value = target_text.encode(encoding)
+    elif isinstance(target_text, List) and is_plural:
+        value = encode_msgstr_plural(target_text, encoding)
+    return value
 
 
 def is_valid_game_path(game_path: Path) -> bool:
-    game_info_file = game_path.joinpath('game_info.xml')
-    if not game_info_file.is_file() or not game_path.joinpath('bin').is_dir():
-        # For Steam Clients
-        return game_path.joinpath('steam_api64.dll').is_file() and game_path.joinpath('bin').is_dir()
+    return get_game_install(game_path).valid
+
+
+class GameInstall:
+    # Everything the installer looks up about a game folder, read once and reused until the folder,
+    # game_info.xml or bin/ change (see get_game_install)
+    path: Path
+    signature: Tuple[Optional[int], ...]
+    game_id: Optional[str]
+    valid: bool
+    # (server_region, is_release), None if it can't be told
+    game_type: Optional[Tuple[str, bool]]
+    launcher: Optional[Path]
+    executable: Optional[Path]
+    # Valid build dirs, newest first
+    builds: List[str]
+
+    def __init__(self, path: Path, signature: Tuple[Optional[int], ...]):
+        self.path = path
+        self.signature = signature
+        game_info_file = path.joinpath('game_info.xml')
+        has_bin = path.joinpath('bin').is_dir()
+        has_game_info = game_info_file.is_file()
+        self.game_id = read_game_id(game_info_file) if has_game_info else None
+        self.game_type = None
+        if has_game_info and has_bin:
+            self.valid = self.game_id is not None and ('MK' in self.game_id or 'WOWS' in self.game_id)
+        else:
+            # For Steam Clients
+            self.valid = path.joinpath('steam_api64.dll').is_file() and has_bin
+        if self.game_id is not None:
+            # By default RU
+            self.game_type = server_regions_dict.get(self.game_id, ('ru', 'PT.PRODUCTION' not in self.game_id))
+        elif not has_game_info and path.joinpath('steam_api64.dll').is_file():
+            if path.joinpath('Korabli.exe').is_file():
+                self.game_type = ('ru', True)
+            elif path.joinpath('WorldOfWarships.exe').is_file():
+                self.game_type = ('wg', True)
+        self.launcher = None
+        for launcher in launcher_dict.keys():
+            if path.joinpath(launcher).is_file():
+                self.launcher = path.joinpath(launcher)
+                break
+        self.executable = None
+        for executable in ['Korabli.exe', 'WorldOfWarships.exe']:
+            if path.joinpath(executable).is_file():
+                self.executable = path.joinpath(executable)
+                break
+        self.builds = scan_builds(path.joinpath('bin')) if has_bin else []
+
+    @staticmethod
+    def get_signature(path: Path) -> Tuple[Optional[int], ...]:
+        return get_mtime_ns(path), get_mtime_ns(path.joinpath('game_info.xml')), get_mtime_ns(path.joinpath('bin'))
+
+
+game_installs: Dict[str, GameInstall] = {}
+game_installs_lock = threading.Lock()
+
+
+def get_game_install(game_path: Path) -> GameInstall:
+    game_path = Path(game_path)
+    install_key = str(game_path.absolute())
+    signature = GameInstall.get_signature(game_path)
+    with game_installs_lock:
+        install = game_installs.get(install_key)
+    if install is None or install.signature != signature:
+        install = GameInstall(game_path, signature)
+        with game_installs_lock:
+            game_installs[install_key] = install
+    return install
+
+
+# Returns every valid build dir under bin_path, newest first. GameInstall keeps the result until bin/ changes
+def scan_builds(bin_path: Path) -> List[str]:
+    builds = []
     try:
-        game_info = Et.parse(game_info_file)
-        game_id = game_info.find('.//game/id')
-        if game_id is None:
-            return False
-        return 'MK' in game_id.text or 'WOWS' in game_id.text
+        with os.scandir(bin_path) as entries:
+            # DirEntry.is_dir() is answered from the directory listing itself on Windows
+            builds = [entry.name for entry in entries if entry.name.isdigit() and entry.is_dir()]
+    except OSError:
+        return []
+    return [build for build in sorted(builds, key=int, reverse=True) if is_valid_build_dir(bin_path.joinpath(build))]
+
+
+# A number targets the newest builds, a list exactly the builds named in it
+def get_build_selection(configured: Any) -> Union[int, List[str]]:
+    if isinstance(configured, list) and configured:
+        return [str(build) for build in configured]
+    if isinstance(configured, int) and not isinstance(configured, bool) and configured > 0:
+        return configured
+    return 2
+
+
+def select_builds(game_path: Path, selection: Union[int, List[str]] = 2) -> List[str]:
+    builds = get_game_install(game_path).builds
+    if isinstance(selection, list):
+        return [build for build in builds if build in selection]
+    return builds[:selection]
+
+
+def get_mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# Only reads game_info.xml up to <game><id>, returns None if there is none or the file is broken
+def read_game_id(game_info_file: Path) -> Optional[str]:
+    import xml.etree.ElementTree as Et
+    try:
+        with open(game_info_file, 'rb') as f:
+            tags = []
+            for event, element in Et.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    tags.append(element.tag)
+                    continue
+                if tags[-2:] == ['game', 'id']:
+                    return element.text or ''
+                tags.pop()
     except Exception:
-        return False
+        pass
+    return None
 
 
 def is_valid_build_dir(build_dir: Path) -> bool:
@@ -1029,16 +1603,201 @@ def is_valid_build_dir(build_dir: Path) -> bool:
 
 
 def check_sha256(mo_path: Path, sha256: str):
-    return get_sha256_for_mo(mo_path) == sha256
+    return get_cached_sha256(mo_path) == sha256
+
+
+# Looks for installs without touching the UI, so it can run on any thread.
+# Known paths are only revalidated, the drives are swept on request or if nothing else turned up.
+# Returns (found_in_reg, {known path: still valid}, found_manually)
+def search_games(known_paths: List[str], search_roots: List[str], sweep: bool,
+                 sweep_if_nothing_found: bool) -> Tuple[List[Path], Dict[str, bool], List[Path]]:
+    found_in_reg = find_games_from_reg()
+    validated = run_bounded(lambda path_str: is_valid_game_path(Path(path_str)), known_paths, game_discovery_timeout)
+    found_manually = []
+    if sweep or (sweep_if_nothing_found and not found_in_reg and not any(validated.values())):
+        found_manually = discover_games(search_roots or find_all_drives())
+    return found_in_reg, validated, found_manually
+
+
+def find_games_from_reg() -> List[Path]:
+    lgc_dir_str = win_platform.get_lgc_executable()
+    if not lgc_dir_str:
+        return []
+    import xml.etree.ElementTree as Et
+    try:
+        preferences_path = Path(lgc_dir_str).parent.joinpath('preferences.xml')
+        if not preferences_path.is_file():
+            return []
+        pref_root = Et.parse(preferences_path).getroot()
+        games_block = pref_root.find('.//application/games_manager/games')
+        games = games_block.findall('.//game')
+        if not games:
+            return []
+        path_strs = [game.find('working_dir').text for game in games if game.find('working_dir') is not None]
+        return [Path(dir_str) for dir_str in path_strs if is_valid_game_path(Path(dir_str))]
+    except Exception:
+        return []
 
 
 def find_all_drives() -> List[str]:
-    return ['%s:/' % d for d in string.ascii_uppercase if os.path.exists('%s:' % d)]
+    # Asking a disconnected network drive can block for a long time
+    drives = run_bounded(lambda d: os.path.exists('%s:' % d), list(string.ascii_uppercase), game_discovery_timeout)
+    return ['%s:/' % d for d in string.ascii_uppercase if drives.get(d)]
+
+
+# Runs func for every item on its own daemon thread and waits for all of them together, at most timeout seconds.
+# Items that didn't finish in time are missing from the result, their threads are simply abandoned.
+def run_bounded(func: Callable[[Any], Any], items: List[Any], timeout: float) -> Dict[Any, Any]:
+    results: Dict[Any, Any] = {}
+    threads = [threading.Thread(target=run_bounded_item, args=(func, item, results), daemon=True) for item in items]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return {item: results[item] for item in items if item in results}
+
+
+def run_bounded_item(func: Callable[[Any], Any], item: Any, results: Dict[Any, Any]) -> None:
+    try:
+        results[item] = func(item)
+    except Exception:
+        pass
+
+
+# Probes all roots side by side, a slow root only costs its own results
+def discover_games(roots: List[str], timeout: Optional[float] = None) -> List[Path]:
+    found = run_bounded(find_games_in_root, roots, timeout or game_discovery_timeout)
+    return [game_path for root in roots for game_path in found.get(root, [])]
+
+
+def find_games_in_root(root: str) -> List[Path]:
+    if not os.path.isdir(root):
+        return []
+    return [game_path for game_path in get_game_path_candidates(root) if is_valid_game_path(game_path)]
+
+
+# The places an install usually ends up under root, including every Steam library registered there
+def get_game_path_candidates(root: str) -> List[Path]:
+    root_path = Path(root)
+    steam_dirs = [
+        root_path.joinpath('Program Files (x86)').joinpath('Steam'),
+        root_path.joinpath('Program Files').joinpath('Steam')
+    ]
+    library_dirs = steam_dirs + [root_path.joinpath('SteamLibrary')]
+    for steam_dir in steam_dirs:
+        library_dirs += find_steam_libraries(steam_dir)
+    base_dirs = [root_path.joinpath('Games'), root_path] + \
+        [library_dir.joinpath('steamapps').joinpath('common') for library_dir in library_dirs]
+    return list(dict.fromkeys(base_dir.joinpath(game_dir) for base_dir in base_dirs
+                              for game_dir in ('Korabli', 'Korabli_PT')))
+
+
+# libraryfolders.vdf lists the Steam libraries on other drives or folders
+def find_steam_libraries(steam_dir: Path) -> List[Path]:
+    libraries = []
+    for vdf_file in [steam_dir.joinpath('steamapps').joinpath('libraryfolders.vdf'),
+                     steam_dir.joinpath('config').joinpath('libraryfolders.vdf')]:
+        try:
+            with open(vdf_file, 'r', encoding='utf-8') as f:
+                vdf = f.read()
+        except Exception:
+            continue
+        # Current format: "path" "D:\\SteamLibrary", older clients: "1" "D:\\SteamLibrary"
+        for key, value in re.findall(r'"(path|\d+)"\s+"((?:[^"\\]|\\.)*)"', vdf):
+            if key == 'path' or not value.isdigit():
+                libraries.append(Path(value.replace('\\\\', '\\')))
+    return list(dict.fromkeys(libraries))
 
 
 def get_sha256_for_mo(mo_path: Path):
     with open(mo_path, 'rb') as file:
-        return hashlib.sha256(file.read()).hexdigest()
+        return update_sha256(hashlib.sha256(), file).hexdigest()
+
+
+# hashlib.file_digest only exists from Python 3.11 on
+def update_sha256(digest: Any, file: Any) -> Any:
+    while True:
+        chunk = file.read(1024 * 1024)
+        if not chunk:
+            return digest
+        digest.update(chunk)
+
+
+hash_cache_file = 'l10n_installer/settings/hash_cache.json'
+# path -> {stat: [size, mtime_ns, file id, volume], sha256}
+hash_cache: Optional[Dict[str, Dict[str, Any]]] = None
+hash_cache_lock = threading.Lock()
+
+
+# Status checks run on the Tk thread, so a file is only hashed again once its stat signature changed
+def get_cached_sha256(file: Path) -> str:
+    file_key = str(Path(file).absolute())
+    signature = get_stat_signature(file)
+    with hash_cache_lock:
+        cached = load_hash_cache().get(file_key)
+        if cached and cached.get('stat') == signature:
+            return cached['sha256']
+    sha256 = get_sha256_for_mo(file)
+    remember_sha256(file, sha256, signature)
+    return sha256
+
+
+# Returns the remembered digest, None if the file changed since (or was never hashed), nothing is read
+def get_known_sha256(file: Path) -> Optional[str]:
+    file_key = str(Path(file).absolute())
+    try:
+        signature = get_stat_signature(file)
+    except OSError:
+        return None
+    with hash_cache_lock:
+        cached = load_hash_cache().get(file_key)
+    return cached['sha256'] if cached and cached.get('stat') == signature else None
+
+
+def remember_sha256(file: Path, sha256: str, signature: Optional[List[int]] = None) -> None:
+    file_key = str(Path(file).absolute())
+    with hash_cache_lock:
+        cache = load_hash_cache()
+        cache[file_key] = {'stat': signature or get_stat_signature(file), 'sha256': sha256}
+        # Files that are gone, e.g. uninstalled builds, don't need to be remembered
+        for cached_file in [cached_file for cached_file in cache if not os.path.isfile(cached_file)]:
+            del cache[cached_file]
+        try:
+            mkdir('l10n_installer/settings')
+            with open(hash_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+        except Exception:
+            pass
+
+
+def load_hash_cache() -> Dict[str, Dict[str, Any]]:
+    global hash_cache
+    if hash_cache is None:
+        try:
+            with open(hash_cache_file, 'r', encoding='utf-8') as f:
+                hash_cache = json.load(f)
+        except Exception:
+            hash_cache = {}
+    return hash_cache
+
+
+# On Windows st_ino is the file index, so a file replaced by another one doesn't match even with the same size and mtime
+def get_stat_signature(file: Path) -> List[int]:
+    stat = os.stat(file)
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_dev]
+
+
+# Copies in chunks and hashes the bytes on their way through, so the copy never has to be read back
+def copy_stream_with_sha256(src_file: Any, dst_file: Any) -> str:
+    digest = hashlib.sha256()
+    while True:
+        chunk = src_file.read(1024 * 1024)
+        if not chunk:
+            break
+        digest.update(chunk)
+        dst_file.write(chunk)
+    return digest.hexdigest()
 
 
 # Returns whether the update was successful
@@ -1050,7 +1809,8 @@ def _install_update(
         use_mods: bool = False,
         isolation: bool = False,
         download_src: str = '',
-        server_region: str = 'ru'
+        server_region: str = 'ru',
+        builds: Union[int, List[str]] = 2
 ) -> bool:
     full_gui = isinstance(gui, LocalizationInstaller)
     if full_gui:
@@ -1072,7 +1832,7 @@ def _install_update(
     if full_gui:
         run_dirs = gui.run_dirs.keys()
     else:
-        run_dirs = parse_game_version(None, game_path)[0]
+        run_dirs = parse_game_version(game_path, builds)[0]
     if not run_dirs or len(run_dirs) == 0:
         if full_gui:
             gui.root.after(0, Messagebox.show_error, '未发现游戏版本，无法安装。', '安装汉化')
@@ -1080,13 +1840,57 @@ def _install_update(
         else:
             Messagebox.show_error('未发现游戏版本，无法更新汉化。', '自动更新')
         return False
+    timer = PhaseTimer()
+    with timer.phase('locale_config'):
+        if full_gui:
+            gui.safely_set_install_progress_text('安装locale_config')
+        deploy_locale_config(game_path, run_dirs)
+    gui.safely_set_install_progress(progress=20.0)
+    if full_gui:
+        gui.safely_set_install_progress_text('安装locale_config——完成')
+
+    route_group = 'r' if is_release else 'pt'
+    global_settings = gui.parse_global_settings() if full_gui else read_global_settings()
+    route_stats: Dict[str, Dict[str, float]] = global_settings.get('route_stats', {})
+    if download_src == 'auto':
+        with timer.phase('route'):
+            if full_gui:
+                gui.safely_set_download_progress_text('下载汉化包——选择线路')
+            download_src = select_download_route(route_group, route_stats)
+            if full_gui:
+                gui.safely_set_download_progress_text(f'下载汉化包——线路={download_src}')
+
+    if full_gui:
+        use_ee = gui.supports_ee() and gui.ee_selection.get()
+    import asyncio
+    nothing_wrong, finished = asyncio.run(install_pipeline(gui, timer, game_path, list(run_dirs), route_group,
+                                                           download_src, route_stats, global_settings,
+                                                           use_ee, use_mods, isolation, server_region))
+    if gui.print_timings:
+        print(timer.summary())
+    if finished:
+        return nothing_wrong
+    if full_gui:
+        gui.is_installing = False
+    if nothing_wrong:
+        gui.safely_set_install_progress(progress=100.0)
+        if full_gui:
+            gui.available_game_paths.append(gui.game_path.get())
+            gui.save_global_settings()
+            gui.save_choice()
+    if full_gui:
+        gui.safely_set_install_progress_text('完成！' if nothing_wrong else '失败！')
+        gui.detect_game_in_background(game_path)
+        gui.root.after(0, gui.popup_result, nothing_wrong)
+    return nothing_wrong
+
+
+def deploy_locale_config(game_path: Path, run_dirs: List[str]) -> None:
     for run_dir in run_dirs:
         build_path = game_path.joinpath('bin').joinpath(run_dir)
         fix_paths(build_path.joinpath('bin64'), run_dir)
         target_path = build_path.joinpath('res_mods')
         mkdir(target_path)
-        if full_gui:
-            gui.safely_set_install_progress_text('安装locale_config')
         # if not is_release:
         #     old_cfg = target_path.joinpath('locale_config.xml')
         #     old_cfg_backup = target_path.joinpath('locale_config.xml.old')
@@ -1097,174 +1901,639 @@ def _install_update(
         # else:
         with open(target_path.joinpath('locale_config.xml'), 'w', encoding='utf-8') as file:
             file.write(builtin_locale_config)
-    gui.safely_set_install_progress(progress=20.0)
-    if full_gui:
-        gui.safely_set_install_progress_text('安装locale_config——完成')
 
-    proxies = {scheme: proxy for scheme, proxy in urllib.request.getproxies().items()}
 
-    # EE
-    if full_gui:
-        use_ee = gui.supports_ee() and gui.ee_selection.get()
-    if use_ee:
-        if full_gui:
-            gui.safely_set_install_progress_text('安装体验增强包')
-            gui.safely_set_download_progress_text('下载体验增强包——连接中')
-        output_file = Path('l10n_installer').joinpath('downloads').joinpath('LK_EE.zip')
-        ee_ready = False
+class PhaseTimer:
+    started: float
+    phases: Dict[str, float]
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        phase_started = time.monotonic()
         try:
-            response = requests.get('https://gitee.com/localized-korabli/Korabli-LESTA-L10N/raw/main'
-                                    '/BuiltInMods/LKExperienceEnhancement.zip', stream=True,
-                                    proxies=proxies, timeout=5000)
-            status = response.status_code
-            if status == 200:
-                if full_gui:
-                    gui.safely_set_download_progress_text('下载体验增强包——下载中')
-                with open(output_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=1024):
-                        if chunk:
-                            f.write(chunk)
-                ee_ready = True
-                if full_gui:
-                    gui.safely_set_download_progress_text('下载体验增强包——完成')
-            elif full_gui:
-                gui.safely_set_download_progress_text(f'下载体验增强包——失败（{status}）')
-        except requests.exceptions.RequestException:
-            if full_gui:
-                gui.safely_set_download_progress_text('下载体验增强包——请求异常')
-        if ee_ready:
-            for run_dir in run_dirs:
-                target_path = game_path.joinpath('bin').joinpath(run_dir).joinpath('res_mods')
-                with zipfile.ZipFile(output_file, 'r') as mo_zip:
-                    process_possible_gbk_zip(mo_zip)
-                    mo_zip.extractall(target_path)
-            if full_gui:
-                gui.safely_set_install_progress_text('安装体验增强包——完成')
-        elif full_gui:
-            gui.safely_set_install_progress_text('安装体验增强包——失败')
-    # 汉化包
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.monotonic() - phase_started
+
+    async def run(self, name: str, func: Callable, *args) -> Any:
+        import asyncio
+        with self.phase(name):
+            return await asyncio.to_thread(func, *args)
+
+    # The phases add up to what a strictly sequential install would have taken
+    def summary(self) -> str:
+        wall_time = time.monotonic() - self.started
+        phase_details = '，'.join(f'{name} {elapsed:.2f}s' for name, elapsed in self.phases.items())
+        return f'安装耗时：{wall_time:.2f}s，各阶段合计{sum(self.phases.values()):.2f}s（{phase_details}）'
+
+
+# Returns (nothing_wrong, finished), finished is True if the install ended early and needs no further handling
+async def install_pipeline(gui: Union[LocalizationInstaller, LocalizationInstallerAuto], timer: PhaseTimer,
+                           game_path: Path, run_dirs: List[str], route_group: str, download_src: str,
+                           route_stats: Dict[str, Dict[str, float]], global_settings: Dict[str, Any],
+                           use_ee: bool, use_mods: bool, isolation: bool, server_region: str) -> Tuple[bool, bool]:
+    import asyncio
+    full_gui = isinstance(gui, LocalizationInstaller)
     gui.safely_set_install_progress(progress=30.0)
     if full_gui:
         gui.safely_set_install_progress_text('安装汉化包')
+    # EE, the catalog and the mods don't depend on each other, only the merge waits for the latter two
+    ee_task = asyncio.create_task(install_ee(gui, timer, game_path, run_dirs, download_src, route_stats)) \
+        if use_ee else None
+    skip_mods = threading.Event()
+    mods_task = asyncio.create_task(timer.run('mods', prepare_mods, gui, game_path, run_dirs, use_mods, isolation,
+                                              global_settings.get('mod_parse_workers', 0), skip_mods))
+    fetched_file, remote_version, up_to_date = await timer.run('catalog', fetch_catalog, gui, game_path, run_dirs,
+                                                               route_group, download_src, route_stats)
+    if up_to_date or not fetched_file:
+        skip_mods.set()
+        await asyncio.gather(*[task for task in (ee_task, mods_task) if task])
+        if up_to_date:
+            return True, True
+        if full_gui:
+            gui.safely_set_install_progress(0.0)
+            gui.safely_set_install_progress_text('安装汉化包——文件异常')
+            gui.is_installing = False
+        Messagebox.show_error('选择本地文件作为汉化来源时，\n请手动启动安装器进行安装。')
+        return False, True
     nothing_wrong = True
-    # remote_version = ''
-    # downloaded_mo = ''
-    local_src = download_src == 'local'
-    fetched_file = None
-    if not local_src:
+    catalog, remote_version = await timer.run('catalog_load', open_catalog, fetched_file, remote_version)
+    if catalog is None:
+        if full_gui:
+            gui.safely_set_install_progress_text('安装汉化包——文件异常')
+        skip_mods.set()
+        nothing_wrong = False
+    prepared_mods = await mods_task
+    modded_files: Dict[str, Optional[str]] = {}
+    if nothing_wrong:
+        if full_gui:
+            gui.safely_set_download_progress_text('下载汉化包——完成')
+        try:
+            modded_files = await timer.run('merge', parse_and_apply_mods, gui, catalog, prepared_mods)
+        except Exception:
+            if full_gui:
+                gui.safely_set_install_progress_text('安装汉化包——文件损坏')
+            nothing_wrong = False
+    if nothing_wrong:
+        if full_gui:
+            gui.safely_set_install_progress_text(f'安装汉化包——移动文件({len(run_dirs)})')
+        deployed = await timer.run('deploy', deploy_unless_launched, gui, deploy_catalogs, game_path, run_dirs,
+                                   server_region, catalog, modded_files, remote_version)
+        if deployed is None:
+            print('游戏已启动，汉化将在下次启动时部署')
+        nothing_wrong = deployed is not False
+        if not nothing_wrong and full_gui:
+            gui.safely_set_install_progress_text('安装汉化包——移动文件失败')
+    if catalog is not None:
+        catalog.close()
+    if ee_task:
+        await ee_task
+    return nothing_wrong, False
+
+
+async def install_ee(gui: Union[LocalizationInstaller, LocalizationInstallerAuto], timer: PhaseTimer,
+                     game_path: Path, run_dirs: List[str], download_src: str,
+                     route_stats: Dict[str, Dict[str, float]]) -> None:
+    ee_file = await timer.run('ee_download', download_ee, gui, download_src, route_stats)
+    # Extracting runs on its own, the catalog doesn't wait for it
+    if ee_file:
+        await timer.run('ee_extract', extract_ee, gui, game_path, run_dirs, ee_file)
+
+
+# The auto mode may have started the game already, files it has open are left alone until the next launch
+def deploy_unless_launched(gui: Union[LocalizationInstaller, LocalizationInstallerAuto, BatchTarget, None],
+                           func: Callable, *args) -> Any:
+    if not isinstance(gui, LocalizationInstallerAuto):
+        return func(*args)
+    return gui.deploy_unless_launched(func, *args)
+
+
+class BatchTarget:
+    # One game folder of a batch job (--batch). Stands in for the installer window the pipeline steps report to
+    game_path: Path
+    # None until detection if the job leaves it open, it then follows the client like the 自动检测 button
+    is_release: Optional[bool]
+    use_ee: bool
+    use_mods: bool
+    isolation: bool
+    download_src: str
+    server_region: Optional[str]
+    builds: Union[int, List[str]]
+    mo_path: str
+    run_dirs: List[str]
+    local_versions: List[str]
+    timer: PhaseTimer
+    result: Dict[str, Any]
+
+    def __init__(self, options: Dict[str, Any]):
+        self.game_path = Path(options['path'])
+        self.is_release = None if options.get('release') is None else bool(options['release'])
+        self.use_ee = bool(options.get('ee', False))
+        self.use_mods = bool(options.get('mods', False))
+        self.isolation = bool(options.get('isolation', False))
+        self.download_src = options.get('src') or 'auto'
+        self.server_region = options.get('region') or None
+        self.builds = get_build_selection(options.get('builds'))
+        self.mo_path = options.get('mo') or ''
+        self.run_dirs = []
+        self.local_versions = []
+        self.timer = PhaseTimer()
+        self.result = {'path': str(self.game_path), 'status': 'pending'}
+
+    # Nobody watches the progress of a batch
+    def safely_set_install_progress(self, progress: Optional[float] = None):
+        pass
+
+    # Targets with the same key get the same catalog, it is fetched once for all of them
+    def get_artifact_key(self) -> str:
+        route_group = 'r' if self.is_release else 'pt'
+        return f'{route_group}/{self.download_src}' + (f'/{self.mo_path}' if self.download_src == 'local' else '')
+
+    def fail(self, status: str, error: str) -> None:
+        self.result['status'] = status
+        self.result['error'] = error
+
+
+# A job file is either JSON, {"workers": 4, "defaults": {...}, "targets": ["D:/Korabli", {"path": "E:/Korabli_PT",
+# "release": false}]} with the option names release/ee/mods/isolation/src/region/builds/mo,
+# or plain text with one game folder per line. Returns (targets, workers), raises ValueError for a malformed job
+def read_batch_job(job_file: str, defaults: Dict[str, Any]) -> Tuple[List[BatchTarget], int]:
+    with open(job_file, 'r', encoding='utf-8') as f:
+        if job_file.endswith('.json'):
+            job = json.load(f)
+        else:
+            job = {'targets': [line.strip() for line in f if line.strip() and not line.startswith('#')]}
+    if not isinstance(job, dict) or not isinstance(job.get('targets'), list):
+        raise ValueError('缺少targets列表')
+    if not isinstance(job.get('defaults', {}), dict):
+        raise ValueError('defaults应为对象')
+    defaults = {**defaults, **job.get('defaults', {})}
+    targets = []
+    for target in job['targets']:
+        if isinstance(target, str):
+            target = {'path': target}
+        if not isinstance(target, dict) or not isinstance(target.get('path'), str):
+            raise ValueError(f'无效的目标：{target}')
+        targets.append(BatchTarget({**defaults, **target}))
+    return targets, max(1, int(job.get('workers', batch_workers)))
+
+
+# Installs into every game folder of the job without any window. Each distinct catalog is downloaded once,
+# each distinct mod set merged once, the deployments run on a bounded pool.
+# The summary is written to summary_file and printed to stdout, the frozen build has no console to print to.
+# Returns True if every target is installed, already up to date or a duplicate of another target
+def run_batch(job_file: str, defaults: Dict[str, Any], summary_file: str = batch_summary_file) -> bool:
+    # Keeps stdout machine-readable, whatever the install steps print goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        summary = install_batch(job_file, defaults)
+    summary_text = json.dumps(summary, ensure_ascii=False, indent=4)
+    if os.path.dirname(summary_file):
+        mkdir(os.path.dirname(summary_file))
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write(summary_text)
+    print(summary_text)
+    return summary['ok']
+
+
+def install_batch(job_file: str, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.monotonic()
+    try:
+        targets, workers = read_batch_job(job_file, defaults)
+    except Exception as ex:
+        return {
+            'ok': False,
+            'elapsed': round(time.monotonic() - started, 3),
+            'error': f'无法读取批量任务：{ex}',
+            'artifacts': {},
+            'targets': []
+        }
+    mkdir('l10n_installer/settings')
+    mkdir('l10n_installer/downloads')
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(detect_batch_target, targets))
+    seen_paths = set()
+    for target in targets:
+        if target.result['status'] != 'pending':
+            continue
+        if target.game_path.resolve() in seen_paths:
+            target.fail('skipped', '重复的游戏目录')
+        seen_paths.add(target.game_path.resolve())
+    ready = [target for target in targets if target.result['status'] == 'pending']
+
+    global_settings = read_global_settings()
+    route_stats: Dict[str, Dict[str, float]] = global_settings.get('route_stats', {})
+    selected_routes: Dict[str, str] = {}
+    for target in ready:
+        if target.download_src == 'auto':
+            route_group = 'r' if target.is_release else 'pt'
+            if route_group not in selected_routes:
+                selected_routes[route_group] = select_download_route(route_group, route_stats)
+            target.download_src = selected_routes[route_group]
+    ee_file = None
+    ee_targets = [target for target in ready if target.use_ee]
+    if ee_targets:
+        ee_file = download_ee(None, ee_targets[0].download_src, route_stats)
+        if ee_file:
+            # Staged once up front, the targets only link the staged files in
+            stage_ee(ee_file, get_download_sha256(ee_file))
+
+    artifacts: Dict[str, List[BatchTarget]] = {}
+    for target in ready:
+        artifacts.setdefault(target.get_artifact_key(), []).append(target)
+    artifact_results = {}
+    parsed_cache: Dict[Tuple[str, str], Optional[ParsedMod]] = {}
+    # Processed catalogs of this batch, the pool may still be linking them while the next target merges
+    batch_files: Set[str] = set()
+    mod_parse_workers = global_settings.get('mod_parse_workers', 0)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for artifact_key, group in artifacts.items():
+            fetch_started = time.monotonic()
+            catalog, remote_version = fetch_batch_catalog(group[0], route_stats)
+            artifact_results[artifact_key] = {'version': remote_version, 'targets': len(group),
+                                              'fetch_time': round(time.monotonic() - fetch_started, 3)}
+            deployments = []
+            for target in group:
+                target.result['version'] = remote_version
+                if catalog is None:
+                    target.fail('failed', '汉化包下载失败或文件损坏')
+                    continue
+                if remote_version != 'local' and compare_with_local(remote_version, target.local_versions):
+                    target.result['status'] = 'up_to_date'
+                    deployments.append(executor.submit(deploy_batch_target, target, None, {}, remote_version,
+                                                       ee_file))
+                    continue
+                # Merging is CPU-bound, it goes target after target while the pool deploys the ones before.
+                # Targets with a mod set that was merged already hit the processed cache
+                try:
+                    with target.timer.phase('mods'):
+                        prepared_mods = prepare_mods(target, target.game_path, target.run_dirs, target.use_mods,
+                                                     target.isolation, mod_parse_workers, threading.Event(),
+                                                     parsed_cache, [catalog.get_sha256()])
+                    with target.timer.phase('merge'):
+                        modded_files = parse_and_apply_mods(target, catalog, prepared_mods, batch_files)
+                except Exception as ex:
+                    target.fail('failed', f'应用模组失败：{ex}')
+                    continue
+                batch_files.update(modded_file for modded_file in modded_files.values() if modded_file)
+                deployments.append(executor.submit(deploy_batch_target, target, catalog, modded_files,
+                                                   remote_version, ee_file))
+            for deployment in deployments:
+                deployment.result()
+            if catalog is not None:
+                catalog.close()
+    save_route_stats(None, route_stats)
+
+    for target in targets:
+        target.result['timings'] = {name: round(elapsed, 3) for name, elapsed in target.timer.phases.items()}
+    return {
+        'ok': all(target.result['status'] in ('installed', 'up_to_date', 'skipped') for target in targets),
+        'elapsed': round(time.monotonic() - started, 3),
+        'artifacts': artifact_results,
+        'targets': [target.result for target in targets]
+    }
+
+
+def detect_batch_target(target: BatchTarget) -> None:
+    with target.timer.phase('detect'):
+        if not is_valid_game_path(target.game_path):
+            target.fail('invalid', '游戏目录不可用')
+            return
+        target.run_dirs = select_builds(target.game_path, target.builds)
+        if not target.run_dirs:
+            target.fail('invalid', '未发现游戏版本')
+            return
+        if target.is_release is None or target.server_region is None:
+            game_type = get_game_install(target.game_path).game_type or ('ru', True)
+            if target.server_region is None:
+                target.server_region = game_type[0]
+            if target.is_release is None:
+                target.is_release = game_type[1]
+        target.local_versions = [get_local_l10n_version(target.game_path, run_dir)[0]
+                                 for run_dir in target.run_dirs]
+    target.result['builds'] = target.run_dirs
+
+
+# Returns (catalog, remote_version), catalog is None if nothing usable could be fetched
+def fetch_batch_catalog(target: BatchTarget, route_stats: Dict[str, Dict[str, float]]) \
+        -> Tuple[Optional[MOCatalog], str]:
+    if target.download_src == 'local':
+        return open_catalog(target.mo_path, 'local')
+    route_group = 'r' if target.is_release else 'pt'
+    fetch_started = time.monotonic()
+    # No local versions, whether a target needs the catalog is decided per target afterwards
+    fetched_file, remote_version, _ = check_version_and_fetch_mo(
+        None, None, download_routes[route_group][target.download_src]['url'])
+    if not fetched_file:
+        record_route_probe(route_stats, target.download_src, False, 0.0)
+        return None, remote_version
+    record_route_throughput(route_stats, target.download_src, os.path.getsize(fetched_file),
+                            time.monotonic() - fetch_started)
+    return open_catalog(fetched_file, remote_version)
+
+
+# catalog is None for targets that are up to date already, they only get locale_config and EE
+def deploy_batch_target(target: BatchTarget, catalog: Optional[MOCatalog], modded_files: Dict[str, Optional[str]],
+                        remote_version: str, ee_file: Optional[Path]) -> None:
+    try:
+        with target.timer.phase('deploy'):
+            deploy_locale_config(target.game_path, target.run_dirs)
+            if catalog is not None and not deploy_catalogs(target.game_path, target.run_dirs, target.server_region,
+                                                           catalog, modded_files, remote_version):
+                target.fail('failed', '移动文件失败')
+                return
+        if target.use_ee:
+            if not ee_file:
+                target.fail('failed', '体验增强包下载失败')
+                return
+            with target.timer.phase('ee'):
+                extract_ee(None, target.game_path, target.run_dirs, ee_file)
+    except Exception as ex:
+        target.fail('failed', str(ex))
+        return
+    if catalog is not None:
+        target.result['status'] = 'installed'
+
+
+def download_ee(gui: Union[LocalizationInstaller, LocalizationInstallerAuto], download_src: str,
+                route_stats: Dict[str, Dict[str, float]]) -> Optional[Path]:
+    full_gui = isinstance(gui, LocalizationInstaller)
+    if full_gui:
+        gui.safely_set_install_progress_text('安装体验增强包')
+        gui.safely_set_download_progress_text('下载体验增强包——连接中')
+    output_file = Path('l10n_installer').joinpath('downloads').joinpath('LK_EE.zip')
+    ee_report = (lambda progress: gui.safely_set_download_progress_text(f'下载体验增强包——{progress}')) \
+        if full_gui else None
+    # Local installs still fetch EE from the mirror that has worked best so far
+    ee_src = download_src if download_src in ee_routes else get_preferred_route(ee_routes.keys(), route_stats)
+    ee_status = download_file(ee_routes[ee_src or 'gitee'], str(output_file), ee_report,
+                              conditional=True, verify=True)
+    ee_ready = ee_status in (200, 304)
+    if full_gui:
+        if ee_status == 304:
+            gui.safely_set_download_progress_text('下载体验增强包——使用已下载文件')
+        elif ee_ready:
+            gui.safely_set_download_progress_text('下载体验增强包——完成')
+        elif ee_status:
+            gui.safely_set_download_progress_text(f'下载体验增强包——失败（{ee_status}）')
+        else:
+            gui.safely_set_download_progress_text('下载体验增强包——请求异常')
+        if not ee_ready:
+            gui.safely_set_install_progress_text('安装体验增强包——失败')
+    return output_file if ee_ready else None
+
+
+# Staging and comparing run while the game may start, only the writes into res_mods wait for the launch decision
+def extract_ee(gui: Union[LocalizationInstaller, LocalizationInstallerAuto, None], game_path: Path,
+               run_dirs: List[str], ee_file: Path) -> None:
+    staged_files = stage_ee(ee_file, get_download_sha256(ee_file))
+    # Files a build already has are skipped one by one, whatever is missing (e.g. a cleared res_mods) comes back
+    stale_files = {}
+    for run_dir in run_dirs:
+        target_path = game_path.joinpath('bin').joinpath(run_dir).joinpath('res_mods')
+        stale_files[target_path] = get_stale_staged_files(staged_files, target_path)
+    if deploy_unless_launched(gui, deploy_staged_files, stale_files) is None:
+        return
+    if isinstance(gui, LocalizationInstaller):
+        gui.safely_set_install_progress_text('安装体验增强包——完成')
+
+
+# Decompresses every member of the bundle once, the builds are populated from the staged copy.
+# Returns {relative path: [size, sha256, mtime_ns]} of the staged files
+def stage_ee(ee_file: Path, ee_hash: str) -> Dict[str, List]:
+    staging_path = Path(ee_staging_dir)
+    manifest_file = ee_staging_dir + '.json'
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['sha256'] == ee_hash and \
+                all(is_staged_file_intact(staging_path.joinpath(name), staged_file)
+                    for name, staged_file in manifest['files'].items()):
+            return manifest['files']
+    except Exception:
+        pass
+    remove_if_exists(manifest_file)
+    shutil.rmtree(staging_path, ignore_errors=True)
+    staged_files: Dict[str, List] = {}
+    with zipfile.ZipFile(ee_file, 'r') as ee_zip:
+        process_possible_gbk_zip(ee_zip)
+        members: Dict[str, zipfile.ZipInfo] = {}
+        for member in ee_zip.infolist():
+            # Same sanitizing as ZipFile.extract, nothing may end up outside of res_mods
+            name_parts = [part for part in member.filename.replace('\\', '/').split('/')
+                          if part not in ('', '.', '..') and not part.endswith(':')]
+            if member.is_dir() or not name_parts:
+                continue
+            members['/'.join(name_parts)] = member
+            mkdir(staging_path.joinpath(*name_parts).parent)
+        # zlib releases the GIL, a few threads decompress members side by side
+        with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as executor:
+            staging = {name: executor.submit(stage_ee_member, ee_zip, member, staging_path.joinpath(name))
+                       for name, member in members.items()}
+        for name, staged_file in staging.items():
+            staged_files[name] = staged_file.result()
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump({'sha256': ee_hash, 'files': staged_files}, f)
+    return staged_files
+
+
+# Returns [size, sha256, mtime_ns] of the staged file
+def stage_ee_member(ee_zip: zipfile.ZipFile, member: zipfile.ZipInfo, staged_file: Path) -> List:
+    with ee_zip.open(member) as member_file, open(staged_file, 'wb') as f:
+        sha256 = copy_stream_with_sha256(member_file, f)
+    return [member.file_size, sha256, os.stat(staged_file).st_mtime_ns]
+
+
+# A build's res_mods shares the staged files through hardlinks, a file edited in place there
+# changes the staged copy as well and the bundle has to be staged again
+def is_staged_file_intact(staged_file: Path, staged_info: List) -> bool:
+    try:
+        stat = os.stat(staged_file)
+    except OSError:
+        return False
+    return [stat.st_size, stat.st_mtime_ns] == [staged_info[0], staged_info[2]]
+
+
+# Returns the staged files target_path doesn't have in the same version
+def get_stale_staged_files(staged_files: Dict[str, List], target_path: Path) -> List[str]:
+    stale_files = []
+    for name, (size, sha256, _) in staged_files.items():
+        staged_file = Path(ee_staging_dir).joinpath(name)
+        target_file = target_path.joinpath(name)
+        if target_file.is_file() and (os.path.samefile(staged_file, target_file) or
+                                      (target_file.stat().st_size == size and
+                                       get_sha256_for_mo(target_file) == sha256)):
+            continue
+        stale_files.append(name)
+    return stale_files
+
+
+# Hardlinks the staged files into each target path, copies them where links aren't possible (e.g. another drive).
+# Returns True so that deploy_unless_launched can tell a deployment from a skipped one
+def deploy_staged_files(stale_files: Dict[Path, List[str]]) -> bool:
+    for target_path, names in stale_files.items():
+        for name in names:
+            staged_file = Path(ee_staging_dir).joinpath(name)
+            target_file = target_path.joinpath(name)
+            if target_file.is_file():
+                os.remove(target_file)
+            else:
+                mkdir(target_file.parent)
+            try:
+                os.link(staged_file, target_file)
+            except OSError:
+                shutil.copyfile(staged_file, target_file)
+    return True
+
+
+# Returns (catalog_file, remote_version, up_to_date), catalog_file is empty if nothing could be fetched
+def fetch_catalog(gui: Union[LocalizationInstaller, LocalizationInstallerAuto], game_path: Path, run_dirs: List[str],
+                  route_group: str, download_src: str,
+                  route_stats: Dict[str, Dict[str, float]]) -> Tuple[str, str, bool]:
+    full_gui = isinstance(gui, LocalizationInstaller)
+    fetched_file = ''
+    if download_src != 'local':
         if full_gui:
             gui.safely_set_download_progress_text('下载汉化包')
-        download_link_base = download_routes['r' if is_release else 'pt'][download_src]['url']
+        download_link_base = download_routes[route_group][download_src]['url']
+        mo_report = (lambda progress: gui.safely_set_download_progress_text(f'下载汉化包——{progress}')) \
+            if full_gui else None
         # Check and Fetch
-        downloaded: Tuple = check_version_and_fetch_mo(None,
-                                                       None if full_gui else parse_game_version(None, game_path)[1],
-                                                       download_link_base, proxies)
+        fetch_started = time.monotonic()
+        local_versions = None if full_gui else \
+            [get_local_l10n_version(game_path, run_dir)[0] for run_dir in run_dirs]
+        if not full_gui:
+            # An update that ran out of launch budget last time is deployed from its download, without any request
+            pending_file, pending_version = get_pending_catalog(local_versions, route_group)
+            if pending_file:
+                return pending_file, pending_version, False
+        downloaded: Tuple = check_version_and_fetch_mo(None, local_versions, download_link_base, mo_report)
         if downloaded[2] is True:
-            return True
+            save_route_stats(gui if full_gui else None, route_stats)
+            return '', '', True
         fetched_file = downloaded[0]
         remote_version = downloaded[1]
+        if fetched_file:
+            record_route_throughput(route_stats, download_src, os.path.getsize(fetched_file),
+                                    time.monotonic() - fetch_started)
+        else:
+            record_route_probe(route_stats, download_src, False, 0.0)
+        save_route_stats(gui if full_gui else None, route_stats)
     else:
         if full_gui:
             fetched_file = gui.mo_path.get()
         remote_version = 'local'
-    if not fetched_file:
-        if full_gui:
-            gui.safely_set_install_progress(0.0)
-            gui.safely_set_install_progress_text('安装汉化包——文件异常')
-            gui.is_installing = False
-        Messagebox.show_error('选择本地文件作为汉化来源时，\n请手动启动安装器进行安装。')
-        return False
-    dir_total = len(run_dirs)
-    dir_progress = 1
+    return fetched_file, remote_version, False
+
+
+# Returns (catalog, remote_version), catalog is None if there is no readable .mo.
+# A zipped catalog is read straight out of the archive into memory, together with the version.info next to it
+def open_catalog(catalog_file: str, remote_version: str) -> Tuple[Optional[MOCatalog], str]:
+    try:
+        if catalog_file.endswith('.mo'):
+            catalog = MOCatalog.open(catalog_file)
+            # A download knows its digest already
+            catalog.sha256 = get_download_sha256(catalog_file)
+            return catalog, remote_version
+        if not catalog_file.endswith('.zip'):
+            return None, remote_version
+        with zipfile.ZipFile(catalog_file, 'r') as mo_zip:
+            process_possible_gbk_zip(mo_zip)
+            info_files = [info for info in mo_zip.filelist if info.filename.endswith('version.info')]
+            if info_files:
+                version_lines = mo_zip.read(info_files[0]).decode('utf-8').splitlines()
+                remote_version = version_lines[0].strip() if version_lines else ''
+            mo_files = [mo for mo in mo_zip.filelist if mo.filename.endswith('.mo')]
+            if not mo_files:
+                return None, remote_version
+            return MOCatalog(mo_zip.read(mo_files[0])), remote_version
+    except Exception:
+        return None, remote_version
+
+
+def deploy_catalogs(game_path: Path, run_dirs: List[str], server_region: str, catalog: MOCatalog,
+                    modded_files: Dict[str, Optional[str]], remote_version: str) -> bool:
+    nothing_wrong = True
+    # The digest of every distinct catalog is known before anything is written, none of the builds is read back
+    artifact_hashes = {}
     for run_dir in run_dirs:
-        execution_time = str(time.time_ns())
-        target_path = game_path.joinpath('bin').joinpath(run_dir).joinpath('res_mods')
-        version_info_file: Optional[Path] = None
-        if fetched_file.endswith('.zip'):
-            extracted_path = Path('l10n_installer').joinpath('downloads').joinpath('extracted_mo')
-            mkdir(extracted_path)
-            info_fetched = False
-            with zipfile.ZipFile(fetched_file, 'r') as mo_zip:
-                process_possible_gbk_zip(mo_zip)
-                info_files = [info for info in mo_zip.filelist if info.filename.endswith('version.info')]
-                if info_files:
-                    info_file_name = info_files[0].filename
-                    mo_zip.extract(info_file_name, extracted_path)
-                    version_info_file = extracted_path.joinpath(info_file_name)
-                    info_fetched = True
-                mo_files = [mo for mo in mo_zip.filelist if mo.filename.endswith('.mo')]
-                if mo_files:
-                    mo_file_name = mo_files[0].filename
-                    mo_zip.extract(mo_file_name, extracted_path)
-                    fetched_file = os.path.join(extracted_path, mo_file_name)
-            if info_fetched and version_info_file and version_info_file.is_file():
-                with open(version_info_file, 'r', encoding='utf-8') as f:
-                    remote_version = f.readline()
-        if not fetched_file.endswith('.mo') or not os.path.isfile(fetched_file):
-            if full_gui:
-                gui.safely_set_install_progress_text('安装汉化包——文件异常')
-            nothing_wrong = False
-            break
-        if nothing_wrong:
-            if full_gui:
-                gui.safely_set_download_progress_text('下载汉化包——完成')
-            mods = get_mods(use_mods, game_path, run_dir, game_path if isolation else Path('.'))
-            fetched_file = parse_and_apply_mods(gui, fetched_file, mods, execution_time, dir_progress, dir_total)
-            cache_path = 'l10n_installer/cache'
-            if os.path.isdir(cache_path):
-                shutil.rmtree(cache_path)
-            if fetched_file == '':
-                if full_gui:
-                    gui.safely_set_install_progress_text('安装汉化包——文件损坏')
+        modded_file = modded_files[run_dir]
+        if modded_file in artifact_hashes:
+            continue
+        if modded_file:
+            artifact_hashes[modded_file] = get_known_sha256(Path(modded_file)) or get_sha256_for_mo(Path(modded_file))
+        else:
+            artifact_hashes[modded_file] = catalog.get_sha256()
+    with ThreadPoolExecutor(max_workers=len(run_dirs)) as executor:
+        deployments = [executor.submit(deploy_catalog, game_path, run_dir, server_region, catalog,
+                                       modded_files[run_dir], remote_version, artifact_hashes[modded_files[run_dir]])
+                       for run_dir in run_dirs]
+        for deployment in deployments:
+            try:
+                deployment.result()
+            except OSError:
                 nothing_wrong = False
-                break
-        if nothing_wrong:
-            if full_gui:
-                gui.safely_set_install_progress_text(f'安装汉化包——移动文件({dir_progress}/{dir_total})')
-            mo_dir = target_path.joinpath('texts').joinpath(server_region).joinpath('LC_MESSAGES')
-            mkdir(mo_dir)
-            old_mo = mo_dir.joinpath('global.mo')
-            old_mo_backup = mo_dir.joinpath('global.mo.old')
-            # if not is_release:
-            #     if not os.path.isfile(old_mo_backup) and os.path.isfile(old_mo):
-            #         shutil.copy(old_mo, old_mo_backup)
-            shutil.copy(fetched_file, old_mo)
-
-            info_path = game_path.joinpath('bin').joinpath(run_dir).joinpath('l10n')
-            mkdir(info_path)
-            installation_info_file = info_path.joinpath('installation.info')
-            with open(installation_info_file, 'w', encoding='utf-8') as f:
-                f.writelines([
-                    remote_version,
-                    '\n',
-                    str(old_mo.absolute()),
-                    '\n',
-                    get_sha256_for_mo(old_mo)
-                ])
-                try:
-                    float(remote_version)
-                except ValueError:
-                    f.write(f'\n{time.time()}')
-        dir_progress += 1
-    if full_gui:
-        gui.is_installing = False
-    if nothing_wrong:
-        gui.safely_set_install_progress(progress=100.0)
-        if full_gui:
-            gui.available_game_paths.append(gui.game_path.get())
-            gui.save_global_settings()
-            gui.save_choice()
-    if full_gui:
-        gui.safely_set_install_progress_text('完成！' if nothing_wrong else '失败！')
-        parse_game_version(gui, gui.get_game_path())
-        gui.root.after(0, gui.popup_result, nothing_wrong)
     return nothing_wrong
 
 
+# A build without mods gets the catalog itself (modded_file is None), linked to the file it was read from,
+# or written straight from memory if it came out of a zip.
+# mo_sha256 is the digest of what gets deployed, a build that has exactly this catalog already keeps its file
+def deploy_catalog(game_path: Path, run_dir: str, server_region: str, catalog: MOCatalog,
+                   modded_file: Optional[str], remote_version: str, mo_sha256: str) -> None:
+    target_path = game_path.joinpath('bin').joinpath(run_dir).joinpath('res_mods')
+    mo_dir = target_path.joinpath('texts').joinpath(server_region).joinpath('LC_MESSAGES')
+    mkdir(mo_dir)
+    old_mo = mo_dir.joinpath('global.mo')
+    if not old_mo.is_file() or get_cached_sha256(old_mo) != mo_sha256:
+        if modded_file:
+            replace_with_link(modded_file, old_mo)
+        elif catalog.file is not None:
+            replace_with_link(catalog.file.name, old_mo)
+        else:
+            replace_with_bytes(old_mo, catalog.view)
+        # The next status check finds the digest without reading the catalog back
+        remember_sha256(old_mo, mo_sha256)
+
+    info_path = game_path.joinpath('bin').joinpath(run_dir).joinpath('l10n')
+    mkdir(info_path)
+    installation_info = f'{remote_version}\n{old_mo.absolute()}\n{mo_sha256}'
+    try:
+        float(remote_version)
+    except ValueError:
+        installation_info += f'\n{time.time()}'
+    replace_with_bytes(info_path.joinpath('installation.info'), installation_info.encode('utf-8'))
+
+
+# The game never sees a half-written file: the new one is put next to the target and swapped in with os.replace.
+# On the same volume the processed or downloaded catalog is hardlinked, no bytes are copied. The processed cache
+# and the downloads only ever replace their files, so a deployed link never changes under the build
+def replace_with_link(src: Any, dst: Path) -> None:
+    temp_file = str(dst) + '.tmp'
+    remove_if_exists(temp_file)
+    try:
+        os.link(src, temp_file)
+    except OSError:
+        # Another volume, or a file system without hardlinks
+        shutil.copyfile(src, temp_file)
+    os.replace(temp_file, dst)
+
+
+def replace_with_bytes(dst: Path, data: Any) -> None:
+    temp_file = str(dst) + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+    os.replace(temp_file, dst)
+
+
 def fix_paths(build_dir: Path, run_dir: str):
     if not build_dir.is_dir():
         return
     xml_path = build_dir.joinpath('paths.xml')
+    import xml.etree.ElementTree as Et
     try:
         tree = Et.parse(xml_path)
         root = tree.getroot()
@@ -1305,35 +2574,114 @@ def fix_paths(build_dir: Path, run_dir: str):
         print(f"修改XML时出现异常：{e}")
 
 
+# Probes version.info on every mirror at once and returns the fastest one that answers.
+# A mirror that has been faster in earlier runs still wins if it answers shortly after the first one.
+def select_download_route(route_group: str, route_stats: Dict[str, Dict[str, float]]) -> str:
+    routes = download_routes[route_group]
+    preferred = get_preferred_route(routes.keys(), route_stats)
+    executor = ThreadPoolExecutor(max_workers=len(routes))
+    probes = {src: executor.submit(probe_route, routes[src]['url'] + 'version.info') for src in routes}
+    probe_srcs = {probe: src for src, probe in probes.items()}
+    selected = None
+    probed = set()
+    try:
+        for probe in as_completed(probe_srcs.keys(), timeout=route_probe_timeout):
+            src = probe_srcs[probe]
+            ok, latency = probe.result()
+            record_route_probe(route_stats, src, ok, latency)
+            probed.add(src)
+            if ok:
+                selected = src
+                break
+        # The preferred mirror only gets its grace period if it has not answered yet, a failure is counted once
+        if selected and preferred and preferred not in probed:
+            ok, latency = probes[preferred].result(timeout=route_preference_grace)
+            record_route_probe(route_stats, preferred, ok, latency)
+            if ok:
+                selected = preferred
+    except Exception:
+        pass
+    # Slow probes are left to finish on their own
+    executor.shutdown(wait=False)
+    return selected or preferred or next(iter(routes))
+
+
+# Returns (ok: bool, latency: float)
+def probe_route(probe_link: str) -> Tuple[bool, float]:
+    import requests
+    started = time.monotonic()
+    try:
+        with get_http_transport().get(probe_link, timeout=(route_probe_timeout, route_probe_timeout)) as response:
+            return response.status_code == 200, time.monotonic() - started
+    except requests.exceptions.RequestException:
+        return False, time.monotonic() - started
+
+
+def get_preferred_route(routes: Any, route_stats: Dict[str, Dict[str, float]]) -> Optional[str]:
+    healthy = [src for src in routes if route_stats.get(src, {}).get('failures', 0) == 0
+               and route_stats.get(src, {}).get('throughput')]
+    if not healthy:
+        return None
+    return max(healthy, key=lambda src: route_stats[src]['throughput'])
+
+
+def record_route_probe(route_stats: Dict[str, Dict[str, float]], src: str, ok: bool, latency: float) -> None:
+    stats = route_stats.setdefault(src, {})
+    if ok:
+        stats['latency'] = latency if 'latency' not in stats else (stats['latency'] + latency) / 2
+        stats['failures'] = 0
+    else:
+        stats['failures'] = stats.get('failures', 0) + 1
+    stats['updated'] = time.time()
+
+
+def record_route_throughput(route_stats: Dict[str, Dict[str, float]], src: str, size: int, elapsed: float) -> None:
+    if elapsed <= 0:
+        return
+    stats = route_stats.setdefault(src, {})
+    throughput = size / elapsed
+    stats['throughput'] = throughput if 'throughput' not in stats else (stats['throughput'] + throughput) / 2
+    stats['failures'] = 0
+    stats['updated'] = time.time()
+
+
+def save_route_stats(gui: Optional[LocalizationInstaller], route_stats: Dict[str, Dict[str, float]]) -> None:
+    if gui:
+        # Written out together with the other global settings
+        gui.parse_global_settings()['route_stats'] = route_stats
+        return
+    global_settings = read_global_settings()
+    global_settings['route_stats'] = route_stats
+    try:
+        mkdir('l10n_installer/settings')
+        with open('l10n_installer/settings/global.json', 'w', encoding='utf-8') as f:
+            json.dump(global_settings, f, ensure_ascii=False, indent=4)
+    except OSError:
+        pass
+
+
 # Returns (output_file: str, remote_version: str, should_skip: bool)
 def check_version_and_fetch_mo(
         gui: Optional[LocalizationInstaller],
         l10n_versions: Optional[List[str]],
         download_link_base: str,
-        proxies: Dict
+        report: Optional[Callable[[str], None]] = None
 ) -> (str, str, bool):
     full_gui = gui is not None
     remote_version: str = 'latest'
     if full_gui:
         gui.safely_set_download_progress_text('下载汉化包——获取版本')
-    try:
-        response = requests.get(download_link_base + 'version.info', stream=True, proxies=proxies, timeout=5000)
-        status = response.status_code
-        if status == 200:
-            info_file = 'l10n_installer/downloads/version.info'
-            with open(info_file, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024):
-                    if chunk:
-                        f.write(chunk)
-            with open(info_file, 'r', encoding='utf-8') as f:
-                remote_version = f.readline().strip()
-                if full_gui:
-                    gui.safely_set_download_progress_text(f'下载汉化包——最新={remote_version}')
-                elif compare_with_local(remote_version, l10n_versions):
-                    return '', '', True
-
-    except requests.exceptions.RequestException:
-        pass
+    # A dead mirror fails version.info and both catalog names within one deadline, not one each
+    deadline = time.monotonic() + download_deadline
+    info_file = 'l10n_installer/downloads/version.info'
+    if download_file(download_link_base + 'version.info', info_file, conditional=True,
+                     deadline=deadline) in (200, 304):
+        with open(info_file, 'r', encoding='utf-8') as f:
+            remote_version = f.readline().strip()
+            if full_gui:
+                gui.safely_set_download_progress_text(f'下载汉化包——最新={remote_version}')
+            elif compare_with_local(remote_version, l10n_versions):
+                return '', '', True
     valid_version = remote_version != 'latest'
     if not valid_version:
         if full_gui:
@@ -1343,21 +2691,24 @@ def check_version_and_fetch_mo(
     # Check existed
     if full_gui:
         if valid_version and gui.last_installed_l10n_version == remote_version:
-            if os.path.isfile(output_file):
+            # The file may be the public test catalog of the same version
+            downloaded_from = read_download_meta(output_file + '.meta.json').get('url') or ''
+            if os.path.isfile(output_file) and get_route_group(downloaded_from) == get_route_group(download_link_base):
                 try:
-                    if polib.mofile(output_file):
-                        gui.safely_set_download_progress_text(f'下载汉化包——使用已下载文件')
-                        return output_file, remote_version, False
+                    with MOCatalog.open(output_file) as downloaded_mo:
+                        if len(downloaded_mo):
+                            gui.safely_set_download_progress_text(f'下载汉化包——使用已下载文件')
+                            return output_file, remote_version, False
                 except Exception:
                     pass
     # Download from remote
-    output_file = download_mo_from_remote(download_link_base + mo_file_name, output_file, proxies)
+    output_file = download_mo_from_remote(download_link_base + mo_file_name, output_file, report, deadline)
     if valid_version and output_file == '':
         # valid_version = False
         remote_version = 'latest'
         mo_file_name = f'{remote_version}.mo'
         output_file = f'l10n_installer/downloads/{mo_file_name}'
-        output_file = download_mo_from_remote(download_link_base + mo_file_name, output_file, proxies)
+        output_file = download_mo_from_remote(download_link_base + mo_file_name, output_file, report, deadline)
     return output_file, remote_version, False
 
 
@@ -1385,159 +2736,593 @@ def compare_with_local(remote_version: str, local_versions: Optional[List[str]])
     return True
 
 
-def get_mods(mods_selection: bool, game_path: Path, run_dir: str, instance_dir: Path) -> List[str]:
-    if not mods_selection:
-        return []
-    installer_mods_dir = instance_dir.joinpath('l10n_installer').joinpath('mods')
-    compat_mods_dir_0 = game_path.joinpath('bin').joinpath(run_dir).joinpath('res_mods') \
-        .joinpath('texts').joinpath('l10n_mods')
-    compat_mods_dir_1 = game_path.joinpath('bin').joinpath(run_dir).joinpath('res_mods') \
-        .joinpath('texts').joinpath('mods')
-    if not installer_mods_dir.is_dir() and not compat_mods_dir_0.is_dir() and not compat_mods_dir_1.is_dir():
+def get_mods(mods_selection: bool, mods_dir: Path, mod_index: Dict[str, Dict[str, Any]]) -> List[str]:
+    if not mods_selection or not mods_dir.is_dir():
         return []
     file_list = []
     mkdir('l10n_installer/cache')
-    scan_mods(file_list, installer_mods_dir)
-    scan_mods(file_list, compat_mods_dir_0)
-    scan_mods(file_list, compat_mods_dir_1)
+    scan_mods(file_list, mods_dir, mod_index)
     return file_list
 
 
-def scan_mods(file_list: List[str], mods_dir: Path) -> None:
-    extracted_list = []
+def get_build_mods(mods_selection: bool, game_path: Path, run_dir: str,
+                   mod_index: Dict[str, Dict[str, Any]]) -> List[str]:
+    texts_dir = game_path.joinpath('bin').joinpath(run_dir).joinpath('res_mods').joinpath('texts')
+    return get_mods(mods_selection, texts_dir.joinpath('l10n_mods'), mod_index) + \
+        get_mods(mods_selection, texts_dir.joinpath('mods'), mod_index)
+
+
+def scan_mods(file_list: List[str], mods_dir: Path, mod_index: Dict[str, Dict[str, Any]]) -> None:
     for root0, _, files0 in os.walk(mods_dir):
+        zipped_mods = []
         for name0 in files0:
             if name0.endswith(('.mo', '.po', '.json', '.l10nmod')):
                 file_list.append(os.path.abspath(os.path.join(root0, name0)))
             elif name0.endswith('.zip'):
-                try:
-                    mod_name = os.path.basename(name0).replace('.zip', '')
-                    extracted_cache = f'l10n_installer/cache/{mod_name}'
-                    with zipfile.ZipFile(os.path.join(root0, name0), 'r') as mod_zip:
-                        process_possible_gbk_zip(mod_zip)
-                        mod_files = [mod_file for mod_file in mod_zip.filelist if
-                                     mod_file.filename.split('/')[-1].endswith(('.mo', '.po', '.json', '.l10nmod'))]
-                        for mod_file in mod_files:
-                            mod_zip.extract(mod_file, extracted_cache)
-
-                    extracted_list.append(extracted_cache)
-                except Exception as ex:
-                    print(ex)
-        for extracted_cache in extracted_list:
-            for root1, _, files1 in os.walk(extracted_cache):
-                for name1 in files1:
-                    if name1.endswith(('.mo', '.po', '.json', '.l10nmod')):
-                        file_list.append(os.path.abspath(os.path.join(root1, name1)))
-
-
-def parse_and_apply_mods(gui: Union[LocalizationInstaller, LocalizationInstallerAuto], downloaded_mo: str,
-                         mods: List[str],
-                         execution_time: str,
-                         dir_progress: int,
-                         dir_total: int) -> str:
-    full_gui = isinstance(gui, LocalizationInstaller)
+                zipped_mods.append(os.path.abspath(os.path.join(root0, name0)))
+        # The files of a zipped mod follow the loose files next to it, each of them exactly once
+        for mod_zip_path in zipped_mods:
+            file_list.extend(get_zipped_mod_files(mod_zip_path, mod_index))
+
+
+# Returns the mod files extracted from a zipped mod, a zip is only extracted again once it changed
+def get_zipped_mod_files(mod_zip_path: str, mod_index: Dict[str, Dict[str, Any]]) -> List[str]:
+    try:
+        stat = os.stat(mod_zip_path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        indexed = mod_index.get(mod_zip_path)
+        extracted = indexed is not None and all(os.path.isfile(member) for member in indexed['members'])
+        if extracted and indexed['stat'] == signature:
+            return indexed['members']
+        zip_hash = get_sha256_for_mo(Path(mod_zip_path))
+        if extracted and indexed['sha256'] == zip_hash:
+            # Only touched, e.g. copied over with the same content
+            indexed['stat'] = signature
+            return indexed['members']
+        mod_name = os.path.basename(mod_zip_path).replace('.zip', '')
+        # Builds may ship different zips under the same name, keep their extractions apart
+        path_hash = hashlib.sha256(mod_zip_path.encode('utf-8')).hexdigest()[:8]
+        extracted_cache = f'l10n_installer/cache/{mod_name}_{path_hash}'
+        shutil.rmtree(extracted_cache, ignore_errors=True)
+        with zipfile.ZipFile(mod_zip_path, 'r') as mod_zip:
+            process_possible_gbk_zip(mod_zip)
+            mod_files = [mod_file for mod_file in mod_zip.filelist if
+                         mod_file.filename.split('/')[-1].endswith(('.mo', '.po', '.json', '.l10nmod'))]
+            for mod_file in mod_files:
+                mod_zip.extract(mod_file, extracted_cache)
+        members = []
+        for root1, _, files1 in os.walk(extracted_cache):
+            for name1 in files1:
+                if name1.endswith(('.mo', '.po', '.json', '.l10nmod')):
+                    members.append(os.path.abspath(os.path.join(root1, name1)))
+        mod_index[mod_zip_path] = {'stat': signature, 'sha256': zip_hash, 'cache': extracted_cache,
+                                   'members': members}
+        return members
+    except Exception as ex:
+        print(ex, file=sys.stderr)
+        return []
+
+
+def load_mod_index() -> Dict[str, Dict[str, Any]]:
     try:
-        downloaded_mo_instance = polib.mofile(downloaded_mo)
+        with open(mod_index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
     except Exception:
-        return ''
-    mods_count = len(mods)
-    if mods_count == 0:
+        return {}
+
+
+def save_mod_index(mod_index: Dict[str, Dict[str, Any]]) -> None:
+    # Zipped mods that were removed take their extracted files with them
+    for mod_zip_path in [mod_zip_path for mod_zip_path in mod_index if not os.path.isfile(mod_zip_path)]:
+        shutil.rmtree(mod_index.pop(mod_zip_path)['cache'], ignore_errors=True)
+    try:
+        mkdir('l10n_installer/cache')
+        with open(mod_index_file, 'w', encoding='utf-8') as f:
+            json.dump(mod_index, f)
+    except Exception:
+        pass
+
+
+class PreparedMods:
+    shared_mods: List[str]
+    build_mods: Dict[str, List[str]]
+    mod_hashes: Dict[str, str]
+    parsed_mods: Dict[str, Optional[ParsedMod]]
+    # (mod, sha256) -> parsed mod, batch installs parse a mod shared by several targets only once
+    parsed_cache: Dict[Tuple[str, str], Optional[ParsedMod]]
+    mod_parse_workers: Any
+
+
+# Discovers, hashes and parses the mods while the catalog is still downloading.
+# source_hashes are the base catalogs the install may end up with, the downloaded ones if not given
+def prepare_mods(gui: Union[LocalizationInstaller, LocalizationInstallerAuto, BatchTarget], game_path: Path,
+                 run_dirs: List[str], use_mods: bool, isolation: bool, mod_parse_workers: Any, skip: threading.Event,
+                 parsed_cache: Optional[Dict[Tuple[str, str], Optional[ParsedMod]]] = None,
+                 source_hashes: Optional[List[str]] = None) -> PreparedMods:
+    prepared_mods = PreparedMods()
+    mod_index = load_mod_index() if use_mods else {}
+    # Installer mods are shared by every build, only the compat mod folders differ
+    instance_dir = game_path if isolation else Path('.')
+    prepared_mods.shared_mods = get_mods(use_mods, instance_dir.joinpath('l10n_installer').joinpath('mods'),
+                                         mod_index)
+    prepared_mods.build_mods = {run_dir: get_build_mods(use_mods, game_path, run_dir, mod_index)
+                                for run_dir in run_dirs}
+    if use_mods:
+        save_mod_index(mod_index)
+    all_mods = list(dict.fromkeys(prepared_mods.shared_mods + [mod for mods in prepared_mods.build_mods.values()
+                                                               for mod in mods]))
+    prepared_mods.mod_hashes = {mod: get_sha256_for_mo(Path(mod)) for mod in all_mods}
+    prepared_mods.parsed_cache = {} if parsed_cache is None else parsed_cache
+    prepared_mods.mod_parse_workers = mod_parse_workers
+    prepared_mods.parsed_mods = {}
+    if source_hashes is None:
+        source_hashes = get_downloaded_catalog_hashes()
+    # Reinstalling an unchanged catalog finds every build in the processed cache and needs no mod parsed.
+    # Should the catalog turn out to be another one, parse_and_apply_mods parses the mods it needs then
+    for source_hash in source_hashes:
+        if all(modded_file is None or is_processed_catalog_cached(modded_file)
+               for modded_file in get_modded_files(source_hash, prepared_mods).values()):
+            return prepared_mods
+    parse_prepared_mods(gui, prepared_mods, all_mods, skip)
+    return prepared_mods
+
+
+# Parses the mods that aren't parsed yet
+def parse_prepared_mods(gui: Union[LocalizationInstaller, LocalizationInstallerAuto, BatchTarget],
+                        prepared_mods: PreparedMods, mods: List[str], skip: Optional[threading.Event] = None) -> None:
+    parsed_cache = prepared_mods.parsed_cache
+    for mod in mods:
+        if mod not in prepared_mods.parsed_mods and (mod, prepared_mods.mod_hashes[mod]) in parsed_cache:
+            prepared_mods.parsed_mods[mod] = parsed_cache[(mod, prepared_mods.mod_hashes[mod])]
+    to_parse = [mod for mod in mods if mod not in prepared_mods.parsed_mods]
+    if not to_parse or (skip is not None and skip.is_set()):
+        return
+    workers = get_mod_parse_workers(prepared_mods.mod_parse_workers, to_parse)
+    for index, (mod, parsed_mod) in enumerate(zip(to_parse, parse_mod_files(to_parse, workers))):
+        # Nothing will be merged, e.g. the installed catalog is already up to date
+        if skip is not None and skip.is_set():
+            break
+        prepared_mods.parsed_mods[mod] = parsed_mod
+        parsed_cache[(mod, prepared_mods.mod_hashes[mod])] = parsed_mod
+        gui.safely_set_install_progress(30.0 + 50.0 * (index + 1) / len(to_parse))
+
+
+# The digests of the catalogs in the downloads folder, one of them is most likely the base of the next install
+def get_downloaded_catalog_hashes() -> List[str]:
+    source_hashes = []
+    try:
+        for entry in os.scandir('l10n_installer/downloads'):
+            if entry.name.endswith('.mo'):
+                download_meta = read_download_meta(entry.path + '.meta.json')
+                if download_meta.get('sha256') and download_meta.get('size') == entry.stat().st_size:
+                    source_hashes.append(download_meta['sha256'])
+    except OSError:
+        pass
+    return source_hashes
+
+
+# Returns {run_dir: modded_file}, modded_file is None for builds that get the catalog without mods.
+# Builds with the same mod list share one catalog
+def get_modded_files(source_hash: str, prepared_mods: PreparedMods) -> Dict[str, Optional[str]]:
+    shared_mods = prepared_mods.shared_mods
+    modded_files: Dict[str, Optional[str]] = {}
+    for run_dir, mods in prepared_mods.build_mods.items():
+        if not shared_mods and not mods:
+            modded_files[run_dir] = None
+            continue
+        modded_files[run_dir] = os.path.join(processed_cache_dir, get_modded_catalog_key(
+            source_hash, [(mod, prepared_mods.mod_hashes[mod]) for mod in shared_mods + mods]
+        ) + '.mo')
+    return modded_files
+
+
+# A cached catalog only counts if it is unchanged since it was built, deployed hardlinks share its data
+def is_processed_catalog_cached(modded_file: str) -> bool:
+    return os.path.isfile(modded_file) and get_known_sha256(Path(modded_file)) is not None
+
+
+# Returns {run_dir: modded_file}, modded_file is None for builds that get the catalog without mods
+# keep_files are processed catalogs still waiting to be deployed elsewhere, e.g. by earlier targets of a batch
+def parse_and_apply_mods(gui: Union[LocalizationInstaller, LocalizationInstallerAuto, BatchTarget],
+                         source_mo: MOCatalog, prepared_mods: PreparedMods,
+                         keep_files: Optional[Set[str]] = None) -> Dict[str, Optional[str]]:
+    full_gui = isinstance(gui, LocalizationInstaller)
+    shared_mods = prepared_mods.shared_mods
+    modded_files = get_modded_files(source_mo.get_sha256(), prepared_mods)
+    to_build: Dict[str, List[str]] = {}
+    for run_dir, modded_file_name in modded_files.items():
+        if modded_file_name is None:
+            continue
+        if is_processed_catalog_cached(modded_file_name):
+            # Cache hit, mark it as recently used. Only the access time, the stat signature keeps its digest valid
+            os.utime(modded_file_name, ns=(time.time_ns(), os.stat(modded_file_name).st_mtime_ns))
+        else:
+            to_build[modded_file_name] = prepared_mods.build_mods[run_dir]
+    if not to_build:
         gui.safely_set_install_progress(90.0)
-        return downloaded_mo
+        return modded_files
     if full_gui:
-        gui.safely_set_install_progress_text(f'安装汉化包——应用模组({str(dir_progress)}/{str(dir_total)})')
-    modded_file_name = f'l10n_installer/processed/modified_{execution_time}.mo'
-    if os.path.isfile(modded_file_name):
-        return modded_file_name
-    applied_mods = 0
-    json_mods_d_replace: Dict[str, Union[str, List[str]]] = {}
-    json_mods_m_replace: Dict[str, str] = {}
-    for mod in mods:
-        try:
-            applied = process_modification_file(downloaded_mo_instance, mod, json_mods_d_replace, json_mods_m_replace)
-        except Exception:
-            pass
-        if applied:
-            applied_mods += 1
-            gui.safely_set_install_progress(
-                30.0 + 60.0 * ((dir_progress - 1) / dir_total + applied_mods / (mods_count * dir_total))
-            )
-    process_json_mods(downloaded_mo_instance, json_mods_d_replace, json_mods_m_replace)
-
-    for file in os.listdir('l10n_installer/processed/'):
+        gui.safely_set_install_progress_text(f'安装汉化包——应用模组')
+    parse_prepared_mods(gui, prepared_mods,
+                        list(dict.fromkeys(shared_mods + [mod for mods in to_build.values() for mod in mods])))
+    mkdir(processed_cache_dir)
+    parsed_mods = prepared_mods.parsed_mods
+    shared_overlay = ModOverlay()
+    for mod in shared_mods:
+        shared_overlay.add_parsed_mod(parsed_mods.get(mod))
+    for modded_file_name, mods in to_build.items():
+        overlay = shared_overlay.copy()
+        for mod in mods:
+            overlay.add_parsed_mod(parsed_mods.get(mod))
+        # Never leave a half-written catalog behind under a valid cache key
+        modded_sha256 = overlay.write_catalog(source_mo, modded_file_name + '.tmp')
+        os.replace(modded_file_name + '.tmp', modded_file_name)
+        remember_sha256(Path(modded_file_name), modded_sha256)
+    # Cache hits of this install are about to be deployed just like the catalogs built now
+    evict_processed_cache(list({modded_file for modded_file in modded_files.values() if modded_file} |
+                               (keep_files or set())))
+    gui.safely_set_install_progress(90.0)
+    return modded_files
+
+
+# The cache key covers everything the output depends on: the pipeline itself, the base catalog and every mod in order
+def get_modded_catalog_key(source_hash: str, mods: List[Tuple[str, str]]) -> str:
+    cache_key = hashlib.sha256(f'{processed_cache_version}\n{source_hash}\n'.encode('utf-8'))
+    for mod, mod_hash in mods:
+        # The extension decides how a mod is parsed
+        cache_key.update(f'{Path(mod).suffix}\n{mod_hash}\n'.encode('utf-8'))
+    return cache_key.hexdigest()
+
+
+# Drops the least recently used catalogs until the cache fits into its size limit
+def evict_processed_cache(keep_files: List[str]) -> None:
+    keep_names = [os.path.basename(keep_file) for keep_file in keep_files]
+    cached_files = []
+    for entry in os.scandir(processed_cache_dir):
+        if not entry.is_file() or entry.name in keep_names:
+            continue
+        if entry.name.startswith('modified_'):
+            # Left behind by older installer versions
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+            continue
+        stat = entry.stat()
+        cached_files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in cached_files) + sum(os.path.getsize(keep_file) for keep_file in keep_files)
+    for _, size, path in sorted(cached_files):
+        if total_size <= processed_cache_limit:
+            break
         try:
-            os.remove(file)
-        except Exception:
+            os.remove(path)
+            total_size -= size
+        except OSError:
             continue
-    downloaded_mo_instance.save(modded_file_name)
-    return modded_file_name
 
 
-def download_mo_from_remote(download_link: str, output_file: str, proxies: Dict) -> str:
+class HttpTransport:
+    # A single pooled session for every request the installer makes, so proxies are looked up once
+    # and back-to-back requests to the same mirror reuse one keep-alive connection.
+    # It makes one attempt per call, retrying is left to download_file, which can resume a dropped body.
+    session: requests.Session
+    timeout: Tuple[float, float]
+    retries: int
+    backoff: float
+    # host -> {requests, retries, failures, wait_time, bytes, transfer_time}
+    stats: Dict[str, Dict[str, float]]
+    lock: threading.Lock
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 30.0, retries: int = 3,
+                 backoff: float = 0.5):
+        import requests
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.proxies.update(urllib.request.getproxies())
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False,
+            timeout: Optional[Tuple[float, float]] = None) -> requests.Response:
+        import requests
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, headers=headers, stream=stream, timeout=timeout or self.timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.record(url, 'failures', 1)
+            raise
+        self.record(url, 'requests', 1)
+        self.record(url, 'wait_time', time.monotonic() - started)
+        return response
+
+    # Connection errors, timeouts and 429/5xx responses are worth another attempt
+    @staticmethod
+    def should_retry(status: int) -> bool:
+        return status in (0, 429, 500, 502, 503, 504)
+
+    # Exponential backoff with full jitter, so clients that failed together don't retry together
+    def backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    def record_transfer(self, url: str, size: int, elapsed: float) -> None:
+        self.record(url, 'bytes', size)
+        self.record(url, 'transfer_time', elapsed)
+
+    def record(self, url: str, counter: str, value: float) -> None:
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            host_stats = self.stats.setdefault(host, {})
+            host_stats[counter] = host_stats.get(counter, 0) + value
+
+
+http_transport: Optional[HttpTransport] = None
+http_transport_lock = threading.Lock()
+
+
+def get_http_transport() -> HttpTransport:
+    global http_transport
+    with http_transport_lock:
+        if http_transport is None:
+            http_transport = HttpTransport()
+        return http_transport
+
+
+def download_mo_from_remote(download_link: str, output_file: str, report: Optional[Callable[[str], None]] = None,
+                            deadline: Optional[float] = None) -> str:
+    # A 304 means the catalog downloaded before is still the one on the mirror
+    status = download_file(download_link, output_file, report, conditional=True, verify=True, deadline=deadline)
+    return output_file if status in (200, 304) else ''
+
+
+# Returns (catalog_file, version) of a completed download newer than what is installed, ('', '') if there is none
+def get_pending_catalog(local_versions: List[str], route_group: str) -> Tuple[str, str]:
     try:
-        response = requests.get(download_link, stream=True, proxies=proxies, timeout=5000)
-        status = response.status_code
-        if status == 200:
-            with open(output_file, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024):
-                    if chunk:
-                        f.write(chunk)
-            return output_file
-    except requests.exceptions.RequestException:
-        return ''
+        with open('l10n_installer/downloads/version.info', 'r', encoding='utf-8') as f:
+            pending_version = f.readline().strip()
+    except OSError:
+        return '', ''
+    catalog_file = f'l10n_installer/downloads/{pending_version}.mo'
+    if not pending_version or pending_version == 'latest' or not os.path.isfile(catalog_file) or \
+            compare_with_local(pending_version, local_versions):
+        return '', ''
+    download_meta = read_download_meta(catalog_file + '.meta.json')
+    # Release and public test catalogs share the downloads folder and often the version, the mirror tells them apart
+    if get_route_group(download_meta.get('url') or '') != route_group:
+        return '', ''
+    if download_meta.get('size') != os.path.getsize(catalog_file) or \
+            download_meta.get('sha256') != get_sha256_for_mo(Path(catalog_file)):
+        return '', ''
+    return catalog_file, pending_version
+
+
+def get_route_group(download_link: str) -> Optional[str]:
+    for route_group, routes in download_routes.items():
+        if any(download_link.startswith(route['url']) for route in routes.values()):
+            return route_group
+    return None
+
+
+# Downloads into output_file + '.part' and resumes an interrupted download with a Range request,
+# as long as the server still has the same file (ETag/Last-Modified checked through If-Range).
+# Only a completed download is moved to output_file.
+# The validators and the digest of output_file are kept next to it. With conditional set, the validators are sent
+# along with the next request, a 304 means the local copy is still up to date.
+# The file is hashed while it is written, with verify set the digest is checked against the one the mirror publishes.
+# No attempt after the first one starts past deadline (time.monotonic()), download_deadline from now if not given.
+# Returns the HTTP status of the download, 0 if the connection failed or the file was corrupted on the way
+def download_file(download_link: str, output_file: str, report: Optional[Callable[[str], None]] = None,
+                  conditional: bool = False, verify: bool = False, deadline: Optional[float] = None) -> int:
+    part_file = output_file + '.part'
+    meta_file = part_file + '.json'
+    transport = get_http_transport()
+    if deadline is None:
+        deadline = time.monotonic() + download_deadline
+    status = 0
+    for attempt in range(transport.retries + 1):
+        if attempt:
+            delay = transport.backoff_delay(attempt - 1)
+            if time.monotonic() + delay >= deadline:
+                break
+            transport.record(download_link, 'retries', 1)
+            time.sleep(delay)
+        status = download_file_once(download_link, output_file, part_file, meta_file, report, conditional, verify)
+        # After a dropped connection the next attempt resumes from what has been written so far
+        if not transport.should_retry(status):
+            break
+    return status
+
+
+def download_file_once(download_link: str, output_file: str, part_file: str, meta_file: str,
+                       report: Optional[Callable[[str], None]], conditional: bool, verify: bool) -> int:
+    # Compressed transfers would break both the byte offsets and the progress
+    headers = {'Accept-Encoding': 'identity'}
+    resume_from = 0
+    part_meta = read_download_meta(meta_file)
+    cache_meta_file = output_file + '.meta.json'
+    if os.path.isfile(part_file) and part_meta.get('url') == download_link:
+        validator = part_meta.get('etag') or part_meta.get('last_modified')
+        if validator:
+            resume_from = os.path.getsize(part_file)
+            headers['Range'] = f'bytes={resume_from}-'
+            headers['If-Range'] = validator
+    elif conditional and os.path.isfile(output_file):
+        cache_meta = read_download_meta(cache_meta_file)
+        if cache_meta.get('url') == download_link:
+            if cache_meta.get('etag'):
+                headers['If-None-Match'] = cache_meta['etag']
+            if cache_meta.get('last_modified'):
+                headers['If-Modified-Since'] = cache_meta['last_modified']
+    try:
+        with get_http_transport().get(download_link, headers=headers, stream=True) as response:
+            status = response.status_code
+            content_range = response.headers.get('Content-Range', '')
+            if status == 304 and conditional:
+                return 304
+            if status == 416 and resume_from and content_range == f'bytes */{resume_from}':
+                # Everything was downloaded already, the connection only dropped before the file was moved
+                return complete_download(download_link, output_file, part_file, meta_file,
+                                         get_sha256_for_mo(Path(part_file)), verify)
+            if status == 206 and resume_from and content_range.startswith(f'bytes {resume_from}-'):
+                mode = 'ab'
+            elif status == 200:
+                mode = 'wb'
+                resume_from = 0
+            else:
+                if resume_from:
+                    # The partial file can't be resumed from, start over next time
+                    remove_if_exists(part_file)
+                    remove_if_exists(meta_file)
+                return status
+            content_length = response.headers.get('Content-Length')
+            total = resume_from + int(content_length) if content_length and content_length.isdigit() else None
+            with open(meta_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'url': download_link,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }, f)
+            digest = hashlib.sha256()
+            if mode == 'ab':
+                # A digest can't be carried over from an earlier run, the bytes already on disk are hashed again
+                with open(part_file, 'rb') as f:
+                    update_sha256(digest, f)
+            downloaded = resume_from
+            chunk_size = 64 * 1024
+            started = time.monotonic()
+            last_report = 0.0
+            with open(part_file, mode) as f:
+                while True:
+                    read_started = time.monotonic()
+                    chunk = response.raw.read(chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    digest.update(chunk)
+                    downloaded += len(chunk)
+                    # Grow the chunks while reads return quickly, shrink them again on a slow link
+                    read_time = time.monotonic() - read_started
+                    if read_time < 0.05 and chunk_size < 4 * 1024 * 1024:
+                        chunk_size *= 2
+                    elif read_time > 0.5 and chunk_size > 16 * 1024:
+                        chunk_size //= 2
+                    now = time.monotonic()
+                    if report and (now - last_report >= 0.2 or downloaded == total):
+                        last_report = now
+                        report(format_download_progress(downloaded, total, downloaded - resume_from, now - started))
+            get_http_transport().record_transfer(download_link, downloaded - resume_from, time.monotonic() - started)
+            if total is not None and downloaded != total:
+                return 0
+        return complete_download(download_link, output_file, part_file, meta_file, digest.hexdigest(), verify)
+    except Exception:
+        # Includes connections dropped in the middle of the body, which urllib3 reports with its own exceptions
+        return 0
+
+
+# Returns 200 once the file is in place, 0 if it doesn't match the digest published for it
+def complete_download(download_link: str, output_file: str, part_file: str, meta_file: str, sha256: str,
+                      verify: bool) -> int:
+    if verify and get_published_sha256(download_link) not in (None, sha256):
+        # Corrupted on the way, the next attempt starts over
+        remove_if_exists(part_file)
+        remove_if_exists(meta_file)
+        return 0
+    finish_download(output_file, part_file, meta_file, sha256)
+    return 200
+
+
+def finish_download(output_file: str, part_file: str, meta_file: str, sha256: str) -> None:
+    part_meta = read_download_meta(meta_file)
+    part_meta['sha256'] = sha256
+    part_meta['size'] = os.path.getsize(part_file)
+    with open(meta_file, 'w', encoding='utf-8') as f:
+        json.dump(part_meta, f)
+    os.replace(part_file, output_file)
+    # The validators of the completed file are the ones sent with the next conditional request
+    os.replace(meta_file, output_file + '.meta.json')
+
+
+# Mirrors may publish a '<file>.sha256' in sha256sum format next to a file. Returns None if there is none
+def get_published_sha256(download_link: str) -> Optional[str]:
+    try:
+        with get_http_transport().get(download_link + '.sha256') as response:
+            if response.status_code != 200:
+                return None
+            published = response.text.split()
+    except Exception:
+        return None
+    if published and re.fullmatch('[0-9a-fA-F]{64}', published[0]):
+        return published[0].lower()
+    return None
+
+
+# The digest computed while output_file was downloaded, the file is only hashed again if it changed since
+def get_download_sha256(output_file: Any) -> str:
+    download_meta = read_download_meta(str(output_file) + '.meta.json')
+    if download_meta.get('sha256') and download_meta.get('size') == os.path.getsize(output_file):
+        return download_meta['sha256']
+    return get_sha256_for_mo(output_file)
+
+
+def read_download_meta(meta_file: str) -> Dict[str, Any]:
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def remove_if_exists(file: Any) -> None:
+    try:
+        os.remove(file)
+    except OSError:
+        pass
+
+
+def format_download_progress(downloaded: int, total: Optional[int], transferred: int, elapsed: float) -> str:
+    rate = transferred / elapsed if elapsed > 0 else 0.0
+    text = f'{format_size(downloaded)}/{format_size(total)}' if total else format_size(downloaded)
+    text += f'，{format_size(rate)}/s'
+    if total and rate > 0:
+        eta = int((total - downloaded) / rate)
+        text += f'，剩余{eta // 60:02d}:{eta % 60:02d}'
+    return text
+
+
+def format_size(size: float) -> str:
+    if size >= 1024 * 1024:
+        return f'{size / 1024 / 1024:.1f}MB'
+    return f'{size / 1024:.1f}KB'
 
 
 # Returns (run_dirs: List[str], installed_l10ns: List[str])
-def parse_game_version(gui: Optional[LocalizationInstaller], game_path: Optional[Path]) -> Tuple[List[str], List[str]]:
-    gui_on = gui is not None
-    if gui_on:
-        gui.run_dirs = {}
-        gui.localization_status_1st.set('未发现游戏版本')
-        gui.localization_status_2nd.set('')
-    v_1st = ''
-    v_2nd = ''
-    if gui_on:
-        game_path = gui.get_game_path()
+def parse_game_version(game_path: Optional[Path], builds: Union[int, List[str]] = 2) -> Tuple[List[str], List[str]]:
     if not game_path:
         return [], []
-    bin_path = game_path.joinpath('bin')
-    if not bin_path.is_dir():
-        return [], []
-    for v_dir_b in os.listdir(bin_path):
-        v_dir = str(v_dir_b)
-        # v_dir_num = 0
-        try:
-            v_dir_num = int(v_dir)
-            if not is_valid_build_dir(bin_path.joinpath(v_dir)):
-                continue
-        except ValueError:
-            continue
-        if not v_1st:
-            v_1st = v_dir
-        elif int(v_1st) > v_dir_num:
-            if not v_2nd or int(v_2nd) < v_dir_num:
-                v_2nd = v_dir
-        else:
-            v_2nd = v_1st
-            v_1st = v_dir
-    if not v_1st:
-        return [], []
-    _1st_l10n_status = get_local_l10n_version(gui, game_path, v_1st)
-    if gui_on:
-        gui.run_dirs[v_1st] = _1st_l10n_status[0]
-        gui.localization_status_1st.set(_1st_l10n_status[1])
-    if v_2nd:
-        _2nd_l10n_status = get_local_l10n_version(gui, game_path, v_2nd)
-        if gui_on:
-            gui.run_dirs[v_2nd] = _2nd_l10n_status[0]
-            gui.localization_status_2nd.set(_2nd_l10n_status[1])
-        return [v_1st, v_2nd], [_1st_l10n_status[0], _2nd_l10n_status[0]]
-    return [v_1st], [_1st_l10n_status[0]]
+    build_statuses = [(run_dir, get_local_l10n_version(game_path, run_dir))
+                      for run_dir in select_builds(game_path, builds)]
+    return [run_dir for run_dir, _ in build_statuses], [l10n_status[0] for _, l10n_status in build_statuses]
+
+
+# The version line of installation.info as written, None if the build has no installed catalog
+def read_installed_l10n_version(game_path: Path, run_dir: str) -> Optional[str]:
+    installation_info_file = game_path.joinpath('bin').joinpath(run_dir).joinpath('l10n') \
+        .joinpath('installation.info')
+    try:
+        with open(installation_info_file, 'r', encoding='utf-8') as f:
+            parsed_version = f.readline().strip()
+            mo_path = Path(f.readline().strip())
+    except OSError:
+        return None
+    return parsed_version if mo_path.is_file() else None
 
 
 # 返回：(汉化版本号: str, 汉化状态: str)
-def get_local_l10n_version(gui: Optional[LocalizationInstaller], game_path: Path, run_dir: str) -> (str, str):
-    gui_on = gui is not None
+def get_local_l10n_version(game_path: Path, run_dir: str) -> (str, str):
     installation_info_file = game_path.joinpath('bin').joinpath(run_dir).joinpath('l10n') \
         .joinpath('installation.info')
     if not installation_info_file.is_file():
@@ -1548,8 +3333,6 @@ def get_local_l10n_version(gui: Optional[LocalizationInstaller], game_path: Path
         if not mo_path.is_file():
             return '', f'{run_dir}——未安装汉化'
         mo_sha256 = f.readline().strip()
-    if gui_on:
-        gui.last_installed_l10n_version = parsed_version
     not_parsable = False
     to_return = parsed_version, f'{run_dir}——{parsed_version}'
     try:
@@ -1576,10 +3359,9 @@ def get_str_from_optional_path(target_path: Optional[Path], prefix: str = '') ->
 # Returns (launcher_file: Path, launcher_status: str)
 def find_launcher(game_path: Optional[Path]) -> (Optional[Path], str):
     if game_path:
-        for launcher in launcher_dict.keys():
-            launcher_file = game_path.joinpath(launcher)
-            if launcher_file.is_file():
-                return launcher_file, launcher_dict.get(launcher)
+        launcher_file = get_game_install(game_path).launcher
+        if launcher_file:
+            return launcher_file, launcher_dict.get(launcher_file.name)
     return None, '未找到客户端'
 
 
@@ -1587,26 +3369,30 @@ def run_launcher(launcher_file: Optional[Path]) -> None:
     if not launcher_file:
         return
     path_text = str(launcher_file.absolute())
+    # Popen, nobody waits for the game to exit
     if path_text.endswith('.exe'):
-        subprocess.run(launcher_file)
+        subprocess.Popen(launcher_file)
     elif path_text.endswith('.dll'):
         parent_path = launcher_file.parent
         if not parent_path.is_dir():
             return
         target_executable = parent_path.joinpath('WorldOfWarships.exe')
         if target_executable.is_file():
-            subprocess.run(target_executable)
+            subprocess.Popen(target_executable)
         else:
             target_executable = parent_path.joinpath('Korabli.exe')
             if target_executable.is_file():
-                subprocess.run(target_executable)
+                subprocess.Popen(target_executable)
 
 
-def is_admin():
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
-    except Exception:
-        return False
+def import_gui_modules() -> None:
+    global tk, filedialog, font, ttk, ToolTip, Messagebox
+    import tkinter as tk
+    from tkinter import filedialog, font
+
+    import ttkbootstrap as ttk
+    from tktooltip import ToolTip
+    from ttkbootstrap.dialogs.dialogs import Messagebox
 
 
 def run():
@@ -1621,8 +3407,26 @@ def run():
     parser.add_option('--isolation', dest='isolation', action='store_true', default=False)
     parser.add_option('--src', dest='download_src')
     parser.add_option('--region', dest='server_region')
+    # --builds 3 targets the three newest builds, --build 123 --build 456 exactly these
+    parser.add_option('--builds', dest='build_count', type='int')
+    parser.add_option('--build', dest='chosen_builds', action='append')
+    # Prints how long the window took to show up and quits, see README for the import breakdown
+    parser.add_option('--startup-time', dest='startup_time', action='store_true', default=False)
+    # Prints how long each install phase took, batch installs always record them in the summary instead
+    parser.add_option('--timings', dest='print_timings', action='store_true', default=False)
+    # --batch job.json (or a text file with one game folder per line) installs without any window,
+    # the other options above are the defaults for every target
+    parser.add_option('--batch', dest='batch_file')
+    parser.add_option('--summary', dest='summary_file')
     options, _ = parser.parse_args()
 
+    if options.batch_file:
+        sys.exit(0 if run_batch(options.batch_file, {
+            'release': options.is_release or None, 'ee': options.use_ee, 'mods': options.use_mods,
+            'isolation': options.isolation, 'src': options.download_src, 'region': options.server_region,
+            'builds': options.chosen_builds or options.build_count
+        }, options.summary_file or batch_summary_file) else 1)
+    import_gui_modules()
     if options.auto is False:
         root = ttk.Window()
         icon = os.path.join(resource_path, 'icon.ico')
@@ -1632,7 +3436,9 @@ def run():
         half_screen_width = int(root.winfo_screenwidth() / 2) - 234
         half_screen_height = int(root.winfo_screenheight() / 2) - 359
         root.geometry(f'+{half_screen_width}+{half_screen_height}')
-        app = LocalizationInstaller(root)
+        app = LocalizationInstaller(root, options.print_timings)
+        if options.startup_time:
+            root.after_idle(report_startup_time, root)
         root.mainloop()
         app.on_closed()
     else:
@@ -1651,16 +3457,47 @@ def run():
         app.on_closed()
 
 
+def get_absolute_batch_args(args: List[str]) -> List[str]:
+    absolute_args = []
+    path_expected = False
+    for arg in args:
+        if path_expected:
+            arg = os.path.abspath(arg)
+            path_expected = False
+        elif arg in ('--batch', '--summary'):
+            path_expected = True
+        elif arg.startswith(('--batch=', '--summary=')):
+            name, value = arg.split('=', 1)
+            arg = f'{name}={os.path.abspath(value)}'
+        absolute_args.append(arg)
+    return absolute_args
+
+
+def report_startup_time(root: tk.Tk):
+    root.update()
+    print(f'首屏耗时：{time.perf_counter() - startup_clock:.3f}s')
+    root.destroy()
+
+
 def configure_font():
-    font_list = list(font.families())
-    if 'SimHei' in font_list:
-        do_configure_font('SimHei')
-    elif '黑体' in font_list:
-        do_configure_font('黑体')
-    elif 'DengXian' in font_list:
-        do_configure_font('DengXian')
-    elif '等线' in font_list:
-        do_configure_font('等线')
+    # Listing every installed family is slow, the pick is remembered in global.json
+    global_settings = read_global_settings()
+    family = global_settings.get('font')
+    if family:
+        do_configure_font(family)
+        return
+    font_list = set(font.families())
+    family = next((family for family in ['SimHei', '黑体', 'DengXian', '等线'] if family in font_list), None)
+    if not family:
+        return
+    do_configure_font(family)
+    global_settings['font'] = family
+    try:
+        mkdir('l10n_installer/settings')
+        with open('l10n_installer/settings/global.json', 'w', encoding='utf-8') as f:
+            json.dump(global_settings, f, ensure_ascii=False, indent=4)
+    except OSError:
+        pass
 
 
 def do_configure_font(family: str):
@@ -1681,14 +3518,23 @@ def process_possible_gbk_zip(zip_file: zipfile.ZipFile):
 
 
 if __name__ == '__main__':
+    # Lets mod parsing worker processes start in the frozen build. The check is the one freeze_support makes,
+    # everything else is spared importing multiprocessing
+    if len(sys.argv) >= 2 and sys.argv[1] == '--multiprocessing-fork':
+        import multiprocessing
+        multiprocessing.freeze_support()
     dev_env = sys.executable.endswith('python.exe')
     if dev_env:
         run()
     else:
+        # Relative job and summary paths are meant from where the installer was started, not from its own folder
+        sys.argv[1:] = get_absolute_batch_args(sys.argv[1:])
         os.chdir(Path(sys.executable).parent)
-        if is_admin():
+        if win_platform.is_admin():
             run()
         else:
-            ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, " ".join(sys.argv[1:]), None, 1)
+            # Whoever started a batch waits for the elevated copy and gets its exit code
+            sys.exit(win_platform.run_as_admin(sys.argv[1:],
+                                               wait=any(arg.startswith('--batch') for arg in sys.argv[1:])))
 
 # pyinstaller -w -i resources/icon.ico --add-data "resources\*;resources" --version-file=version_file.txt installer_gui.py --clean
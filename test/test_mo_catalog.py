@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import polib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import installer_gui  # noqa: E402
+
+test_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+# The mod pipeline the installer had before MOCatalog, on top of polib
+def apply_mods_with_polib(source_file: str, mod_files: list, output_file: str) -> None:
+    source_mo = polib.mofile(source_file)
+    json_mods_d, json_mods_m = {}, {}
+    for mod_file in mod_files:
+        if mod_file.endswith('json'):
+            with open(mod_file, 'r', encoding='utf-8') as f:
+                installer_gui.append_json_mod(json.load(f), json_mods_d, json_mods_m)
+            continue
+        translated = polib.pofile(mod_file) if mod_file.endswith('po') else polib.mofile(mod_file)
+        singular = {entry.msgid: entry for entry in translated if entry.msgid and not entry.msgid_plural}
+        plural = {entry.msgid: entry for entry in translated if entry.msgid and entry.msgid_plural}
+        for entry in source_mo:
+            if not entry.msgid:
+                continue
+            if entry.msgid_plural and entry.msgid in plural:
+                entry.msgstr_plural = plural.pop(entry.msgid).msgstr_plural
+            elif not entry.msgid_plural and entry.msgid in singular:
+                target_str = singular.pop(entry.msgid).msgstr
+                if entry.msgid != 'IDS_RIGHTS_RESERVED':
+                    entry.msgstr = target_str
+        for entry in list(singular.values()) + list(plural.values()):
+            source_mo.append(entry)
+    for entry in source_mo:
+        if not entry.msgid:
+            continue
+        if entry.msgid_plural:
+            msgstr_plural = {int(i): msgstr for i, msgstr in entry.msgstr_plural.items()}
+            for word, replacement in json_mods_m.items():
+                msgstr_plural = {i: msgstr.replace(word, replacement) for i, msgstr in msgstr_plural.items()}
+            target_text = json_mods_d.get(entry.msgid)
+            if isinstance(target_text, str):
+                msgstr_plural = {i: target_text for i in range(len(msgstr_plural))}
+            elif isinstance(target_text, list):
+                msgstr_plural = dict(enumerate(target_text))
+            entry.msgstr_plural = msgstr_plural
+        else:
+            for word, replacement in json_mods_m.items():
+                entry.msgstr = entry.msgstr.replace(word, replacement)
+            target_text = json_mods_d.get(entry.msgid)
+            if isinstance(target_text, str):
+                entry.msgstr = target_text
+    source_mo.save(output_file)
+
+
+def apply_mods_with_catalog(source_file: str, mod_files: list, output_file: str) -> str:
+    overlay = installer_gui.ModOverlay()
+    for mod_file in mod_files:
+        overlay.add_parsed_mod(installer_gui.parse_mod_file(mod_file))
+    with installer_gui.MOCatalog.open(source_file) as source_mo:
+        return overlay.write_catalog(source_mo, output_file)
+
+
+def read_entries(mo_file: str) -> tuple:
+    mo = polib.mofile(mo_file)
+    entries = sorted((entry.msgctxt or '', entry.msgid, entry.msgid_plural or '', entry.msgstr,
+                      sorted((int(i), msgstr) for i, msgstr in entry.msgstr_plural.items()))
+                     for entry in mo)
+    return mo.metadata, entries
+
+
+class TestModOverlay(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_file = self.path('global.mo')
+        source_mo = polib.MOFile()
+        source_mo.metadata = {'Content-Type': 'text/plain; charset=UTF-8',
+                              'Plural-Forms': 'nplurals=3; plural=(n%10==1 && n%100!=11 ? 0 : 1);'}
+        for i in range(50):
+            source_mo.append(polib.MOEntry(msgid=f'IDS_{i}', msgstr=f'“文本{i}”'))
+        source_mo.append(polib.MOEntry(msgid='IDS_RIGHTS_RESERVED', msgstr='© Lesta'))
+        source_mo.append(polib.MOEntry(msgctxt='menu', msgid='IDS_CTX', msgstr='‘菜单’'))
+        source_mo.append(polib.MOEntry(msgid='IDS_SHIPS', msgid_plural='IDS_SHIPS_PLURAL',
+                                       msgstr_plural={0: '“{n}艘”', 1: '{n}艘', 2: '{n}艘船'}))
+        source_mo.append(polib.MOEntry(msgid='IDS_DAYS', msgid_plural='IDS_DAYS_PLURAL',
+                                       msgstr_plural={0: '{n}天', 1: '{n}天', 2: '{n}天'}))
+        source_mo.save(self.source_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.temp_dir.name, name)
+
+    def write_po(self, name: str, entries: list) -> str:
+        po = polib.POFile()
+        po.metadata = {'Content-Type': 'text/plain; charset=UTF-8'}
+        for entry in entries:
+            po.append(entry)
+        po.save(self.path(name))
+        return self.path(name)
+
+    def write_json(self, name: str, json_mod: dict) -> str:
+        with open(self.path(name), 'w', encoding='utf-8') as f:
+            json.dump(json_mod, f, ensure_ascii=False)
+        return self.path(name)
+
+    def assert_same_as_polib(self, mod_files: list) -> None:
+        sha256 = apply_mods_with_catalog(self.source_file, mod_files, self.path('catalog.mo'))
+        apply_mods_with_polib(self.source_file, mod_files, self.path('polib.mo'))
+        self.assertEqual(read_entries(self.path('polib.mo')), read_entries(self.path('catalog.mo')))
+        with open(self.path('catalog.mo'), 'rb') as f:
+            self.assertEqual(hashlib.sha256(f.read()).hexdigest(), sha256)
+
+    def test_read_entries(self):
+        with installer_gui.MOCatalog.open(self.source_file) as source_mo:
+            entries = sorted((msgctxt or '', msgid, msgid_plural or '', msgstr if isinstance(msgstr, str) else '',
+                              sorted(msgstr.items()) if isinstance(msgstr, dict) else [])
+                             for msgctxt, msgid, msgid_plural, msgstr in source_mo.entries())
+        self.assertEqual(read_entries(self.source_file)[1], [entry for entry in entries if entry[1]])
+
+    def test_without_mods(self):
+        self.assert_same_as_polib([])
+
+    def test_po_mods(self):
+        first = self.write_po('first.po', [
+            polib.POEntry(msgid='IDS_1', msgstr='改1'),
+            polib.POEntry(msgid='IDS_2', msgstr='改2'),
+            polib.POEntry(msgid='IDS_RIGHTS_RESERVED', msgstr='不应生效'),
+            polib.POEntry(msgctxt='menu', msgid='IDS_CTX', msgstr='新菜单'),
+            polib.POEntry(msgid='IDS_SHIPS', msgid_plural='IDS_SHIPS_PLURAL',
+                          msgstr_plural={0: '{n}条', 1: '{n}条', 2: '{n}条船'}),
+            polib.POEntry(msgid='IDS_NEW', msgstr='新增'),
+            polib.POEntry(msgctxt='battle', msgid='IDS_NEW_CTX', msgstr='新增上下文'),
+            polib.POEntry(msgid='IDS_NEW_PLURAL', msgid_plural='IDS_NEW_PLURALS',
+                          msgstr_plural={0: '一', 1: '二', 2: '三'})
+        ])
+        # Later mods win, also over entries an earlier mod appended
+        second = self.write_po('second.po', [
+            polib.POEntry(msgid='IDS_2', msgstr='再改2'),
+            polib.POEntry(msgid='IDS_NEW', msgstr='再新增')
+        ])
+        self.assert_same_as_polib([first, second])
+
+    def test_mo_mod(self):
+        mod_mo = polib.MOFile()
+        mod_mo.metadata = {'Content-Type': 'text/plain; charset=UTF-8'}
+        mod_mo.append(polib.MOEntry(msgid='IDS_3', msgstr='改3'))
+        mod_mo.append(polib.MOEntry(msgid='IDS_DAYS', msgid_plural='IDS_DAYS_PLURAL',
+                                    msgstr_plural={0: '{n}日', 1: '{n}日', 2: '{n}日'}))
+        mod_mo.append(polib.MOEntry(msgid='IDS_MO_NEW', msgstr='新增'))
+        mod_mo.save(self.path('mod.mo'))
+        self.assert_same_as_polib([self.path('mod.mo')])
+
+    def test_json_mods(self):
+        replace = self.write_json('replace.json', {'replace': {
+            'IDS_4': '替换4',
+            'IDS_SHIPS': '{n}船',
+            'IDS_DAYS': ['{n}日', '{n}日', '{n}日'],
+            'IDS_NEW': '替换新增'
+        }})
+        po = self.write_po('mod.po', [polib.POEntry(msgid='IDS_NEW', msgstr='“新增”'),
+                                      polib.POEntry(msgid='IDS_5', msgstr='‘改5’')])
+        self.assert_same_as_polib([po, replace, os.path.join(test_dir, 'quote.json')])
+
+    def test_words(self):
+        self.assert_same_as_polib([os.path.join(test_dir, 'quote.json')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# Korabley Localization Installer GUI
+# Copyright © 2024-2025 澪刻LocalizedKorabli
+#
+# This program is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General
+# Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option)
+# any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with this program. If not,
+# see <https://www.gnu.org/licenses/>.
+
+# Everything that needs winreg, pythoncom, winshell or the Win32 API lives here.
+# The Windows-only modules are imported on first use, so installer_gui itself can be imported on any platform.
+import ctypes
+import subprocess
+import sys
+from ctypes import wintypes
+from typing import List, Optional, Tuple
+
+
+def is_admin() -> bool:
+    try:
+        return bool(ctypes.windll.shell32.IsUserAnAdmin())
+    except Exception:
+        return False
+
+
+class ShellExecuteInfo(ctypes.Structure):
+    _fields_ = [
+        ('cbSize', wintypes.DWORD),
+        ('fMask', ctypes.c_ulong),
+        ('hwnd', wintypes.HWND),
+        ('lpVerb', wintypes.LPCWSTR),
+        ('lpFile', wintypes.LPCWSTR),
+        ('lpParameters', wintypes.LPCWSTR),
+        ('lpDirectory', wintypes.LPCWSTR),
+        ('nShow', ctypes.c_int),
+        ('hInstApp', wintypes.HINSTANCE),
+        ('lpIDList', ctypes.c_void_p),
+        ('lpClass', wintypes.LPCWSTR),
+        ('hkeyClass', wintypes.HKEY),
+        ('dwHotKey', wintypes.DWORD),
+        ('hIconOrMonitor', wintypes.HANDLE),
+        ('hProcess', wintypes.HANDLE)
+    ]
+
+
+SEE_MASK_NOCLOSEPROCESS = 0x40
+INFINITE = 0xFFFFFFFF
+
+
+# Starts this executable again elevated. With wait set, returns the exit code of the elevated copy, 0 otherwise
+def run_as_admin(args: List[str], wait: bool = False) -> int:
+    info = ShellExecuteInfo()
+    info.cbSize = ctypes.sizeof(info)
+    info.fMask = SEE_MASK_NOCLOSEPROCESS if wait else 0
+    info.lpVerb = 'runas'
+    info.lpFile = sys.executable
+    info.lpParameters = subprocess.list2cmdline(args)
+    info.nShow = 1
+    if not ctypes.windll.shell32.ShellExecuteExW(ctypes.byref(info)):
+        return 1
+    if not wait or not info.hProcess:
+        return 0
+    exit_code = wintypes.DWORD()
+    try:
+        ctypes.windll.kernel32.WaitForSingleObject(info.hProcess, INFINITE)
+        ctypes.windll.kernel32.GetExitCodeProcess(info.hProcess, ctypes.byref(exit_code))
+    finally:
+        ctypes.windll.kernel32.CloseHandle(info.hProcess)
+    return exit_code.value
+
+
+# Where the Lesta Game Center put lgc.exe, None if it isn't installed (or this isn't Windows)
+def get_lgc_executable() -> Optional[str]:
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r'Software\Classes\lgc\DefaultIcon') as key:
+            lgc_dir_str, _ = winreg.QueryValueEx(key, '')
+    except Exception:
+        return None
+    if lgc_dir_str is None:
+        # Try the default value
+        lgc_dir_str = r'C:\ProgramData\Lesta\GameCenter\lgc.exe'
+    if ',' in lgc_dir_str:
+        lgc_dir_str = lgc_dir_str.split(',')[0]
+    return lgc_dir_str
+
+
+def create_shortcut(shortcut_path: str, target: str, arguments: str, description: str,
+                    icon_location: Optional[Tuple[str, int]] = None) -> None:
+    import pythoncom
+    import winshell
+    pythoncom.CoInitialize()
+    try:
+        with winshell.shortcut(shortcut_path) as link:
+            link.path = target
+            link.description = description
+            if icon_location is not None:
+                link.icon_location = icon_location
+            link.arguments = arguments
+    finally:
+        pythoncom.CoUninitialize()